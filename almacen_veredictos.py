@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Columnas que identifican un tramo del logueo
+COLUMNAS_CLAVE = ["hole_number", "depth_from", "depth_to"]
+
+
+def huella_filas(df, columnas, contexto=()):
+    # Hash de 64 bits por fila de `columnas`, más los valores de `contexto`
+    # (iguales para todas las filas: datos de otra tabla, tolerancia, etc.)
+    datos = df[columnas].reset_index(drop=True)
+    for i, valor in enumerate(contexto):
+        datos[f"_contexto_{i}"] = valor
+    return pd.util.hash_pandas_object(datos, index=False).to_numpy()
+
+
+def huella_tabla(df, columnas):
+    # Hash de una tabla completa que no depende del orden de sus filas
+    return int(huella_filas(df, columnas).sum(dtype=np.uint64))
+
+
+# Veredictos previos de cada validador, indexados por la huella de cada fila
+# (clave + contenido + contexto). Al revalidar un pozo re-exportado solo se
+# calculan las filas cuya huella no está guardada; una fila editada reemplaza
+# a la versión anterior con la misma clave (hole_number, depth_from, depth_to).
+# El almacén ocupa a lo sumo `max_bytes` entre todos los validadores: al
+# superarlo se descartan primero los validadores usados hace más tiempo y, si
+# no alcanza, los veredictos más antiguos del validador actual.
+class AlmacenVeredictos:
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._veredictos = OrderedDict()  # validador -> DataFrame (índice: huella; "_clave" + columnas de resultado), en orden LRU
+        self._bytes = {}  # validador -> memoria estimada de su DataFrame
+        self._lock = threading.RLock()
+        self.estadisticas = {}  # validador -> (filas reutilizadas, filas calculadas) de la última llamada
+
+    def veredictos(self, validador, df, columnas, calcular, contexto=()):
+        # Devuelve los veredictos de las filas de `df`, en el mismo orden. `calcular`
+        # recibe las filas nuevas o cambiadas y devuelve sus veredictos (un
+        # DataFrame con una fila por fila recibida).
+        clave = huella_filas(df, COLUMNAS_CLAVE)
+        huella = huella_filas(df, COLUMNAS_CLAVE + columnas, contexto)
+
+        with self._lock:
+            previos = self._veredictos.get(validador)
+        if previos is None:
+            reutilizables = np.zeros(len(df), dtype=bool)
+        else:
+            posiciones = previos.index.get_indexer(huella)
+            reutilizables = posiciones >= 0
+
+        cambiadas = np.flatnonzero(~reutilizables)
+        partes = []
+        if reutilizables.any():
+            reutilizados = previos.iloc[posiciones[reutilizables]].drop(columns="_clave")
+            partes.append(reutilizados.set_axis(np.flatnonzero(reutilizables)))
+        if len(cambiadas):
+            nuevos = calcular(df.iloc[cambiadas]).reset_index(drop=True)
+            partes.append(nuevos.set_axis(cambiadas))
+            self._guardar(validador, clave[cambiadas], huella[cambiadas], nuevos)
+
+        self.estadisticas[validador] = (int(reutilizables.sum()), len(cambiadas))
+        if not partes:
+            return calcular(df).reset_index(drop=True)
+        return pd.concat(partes).sort_index()
+
+    def _guardar(self, validador, clave, huella, nuevos):
+        nuevos = nuevos.set_axis(huella).assign(_clave=clave)
+        # Solo se mide lo nuevo; lo que se conserva se estima en proporción a sus filas
+        tamano = int(nuevos.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            previos = self._veredictos.pop(validador, None)
+            if previos is not None and len(previos):
+                conservados = previos[~previos["_clave"].isin(clave)]
+                tamano += self._bytes[validador] * len(conservados) // len(previos)
+                nuevos = pd.concat([conservados, nuevos])
+            nuevos = nuevos[~nuevos.index.duplicated(keep="last")]
+            self._veredictos[validador] = nuevos
+            self._bytes[validador] = tamano
+
+            # Desalojar validadores completos, del menos usado al más usado
+            total = sum(self._bytes.values())
+            while total > self.max_bytes and len(self._veredictos) > 1:
+                validador_viejo, _ = self._veredictos.popitem(last=False)
+                total -= self._bytes.pop(validador_viejo)
+
+            # Si el validador actual no cabe solo, conservar sus veredictos más recientes
+            if tamano > self.max_bytes:
+                filas = len(nuevos) * self.max_bytes // tamano
+                self._veredictos[validador] = nuevos.iloc[len(nuevos) - filas:]
+                self._bytes[validador] = tamano * filas // len(nuevos)
+
+    def limpiar(self):
+        with self._lock:
+            self._veredictos.clear()
+            self._bytes.clear()
+            self.estadisticas.clear()
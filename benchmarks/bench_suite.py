@@ -0,0 +1,219 @@
+# Mide el tiempo y el pico de memoria de la lectura, de cada validador y de la
+# exportación a Excel sobre campañas sintéticas de distintos tamaños, y guarda
+# los resultados en JSON para comparar entre versiones.
+#
+# Uso: python benchmarks/bench_suite.py [--filas 10000 1000000 10000000] [--tramos 500]
+#          [--repeticiones 3] [--encoding utf-16] [--lineas-malas 0.001]
+#          [--salida benchmarks/resultados] [--comparar benchmarks/resultados/anterior.json]
+#
+# `filas` son los tramos de Sample, Geology, Alteration y Mine de la campaña
+# (Major y Standards son proporcionales). El tiempo es el mínimo y la mediana de
+# `repeticiones` ejecuciones; el pico de memoria se mide en una ejecución aparte
+# con tracemalloc (no incluye los buffers internos de pyarrow al leer). Antes de medir
+# la exportación se comprueba que las profundidades exportadas sean las del archivo,
+# y antes de todo, que la lectura por pozo coincida con la lectura completa.
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import exportacion  # noqa: E402
+import motor_validacion as motor  # noqa: E402
+from generar_fusion import escribir_campana  # noqa: E402
+
+
+def medir(funcion, repeticiones):
+    # Pico de memoria (tracemalloc) en una ejecución y tiempos en las siguientes
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "segundos_min": min(tiempos),
+        "segundos_mediana": statistics.median(tiempos),
+        "pico_memoria_mb": pico / 2**20,
+    }
+
+
+def comprobar_lectura_por_pozo(carpeta):
+    # La lectura por pozo (por bloques) debe dar las mismas filas y tipos que
+    # filtrar_pozos sobre la lectura completa, también con HOLE_NUMBER numéricos
+    # con ceros a la izquierda y con el archivo repartido en varios bloques
+    ruta = os.path.join(carpeta, "geology_numerico.csv")
+    pozos = [f"{i:04d}" for i in range(20)]
+    pd.DataFrame({
+        "HOLE_NUMBER": np.repeat(pozos, 50), "DEPTH_FROM": np.tile(np.arange(50.0), 20),
+        "DEPTH_TO": np.tile(np.arange(1.0, 51.0), 20), "CLITO": "031", "UNIT": "VD",
+    }).to_csv(ruta, index=False)
+
+    pedidos = ["0007", "0012"]
+    tamano_bloque = motor.TAMANO_BLOQUE
+    motor.TAMANO_BLOQUE = 128
+    try:
+        por_pozo = motor.leer_csv(ruta, pedidos, "geology")
+    finally:
+        motor.TAMANO_BLOQUE = tamano_bloque
+    completa = motor.filtrar_pozos(motor.leer_csv(ruta, None, "geology"), pedidos)
+    # filtrar_pozos devuelve los pozos en el orden pedido; la lectura por pozo, en el del archivo
+    pd.testing.assert_frame_equal(por_pozo, completa.sort_index().reset_index(drop=True), check_categorical=False)
+
+
+def comprobar_profundidades(ruta_sample, sample_standards):
+    # Las profundidades exportadas (Excel y CSV) deben ser las escritas en el
+    # archivo de Sample, no las float32 del esquema ensanchadas a float64
+    columnas = ["sample_number", "depth_from", "depth_to"]
+    esperado = pd.read_csv(ruta_sample, on_bad_lines="skip", float_precision="round_trip")
+    esperado = esperado.rename(columns=str.lower)[columnas].set_index("sample_number")
+    exportados = {
+        "Excel": pd.read_excel(io.BytesIO(exportacion.exportar_a_excel(sample_standards))).rename(columns=str.lower),
+        "CSV": pd.read_csv(io.BytesIO(exportacion.exportar_a_csv(sample_standards)), float_precision="round_trip"),
+    }
+    for formato, df in exportados.items():
+        df = df.dropna(subset=["depth_from"])[columnas].set_index("sample_number")
+        distintos = df.compare(esperado.loc[df.index])
+        if not distintos.empty:
+            raise AssertionError(f"{formato}: profundidades distintas de las del archivo\n{distintos.head()}")
+
+
+def etapas(rutas):
+    # (nombre, función sin argumentos) de cada etapa, en orden. Las tablas se
+    # leen una vez para los validadores; el índice por pozo se mide aparte.
+    for tabla, ruta in rutas.items():
+        yield f"leer_csv {tabla}", lambda tabla=tabla, ruta=ruta: motor.leer_csv(ruta, None, tabla)
+
+    t = {tabla: motor.leer_csv(ruta, None, tabla) for tabla, ruta in rutas.items()}
+    yield "indice_pozo (6 tablas)", lambda: [motor.indice_pozo(df.copy(deep=False)) for df in t.values()]
+    for df in t.values():
+        motor.indice_pozo(df)
+
+    pozo = t["sample"]["hole_number"].iloc[0]
+    yield "validar_geo", lambda: motor.validar_geo(t["geology"], pozo)
+    yield "validar_sample_standards", lambda: motor.validar_sample_standards(t["sample"], t["standards"], pozo)
+    yield "validar_alteration", lambda: motor.validar_alteration(t["alteration"], pozo)
+    for tipo in ["Geology", "Major", "Alteration", "Mine"]:
+        yield f"validar_intervalos {tipo}", lambda tipo=tipo: motor.validar_intervalos(
+            t["sample"], t[tipo.lower()], tipo, pozo
+        )
+    yield "validar_major_geology", lambda: motor.validar_major_geology(t["geology"], t["major"], pozo)
+    yield "calcular_porcentaje_standards", lambda: motor.calcular_porcentaje_standards(t["sample"], t["standards"], pozo)
+    yield "porcentaje_standards_campana", lambda: motor.porcentaje_standards_campana(t["sample"], t["standards"])
+
+    tablas_campana = {f"{tabla}_df": df for tabla, df in t.items()}
+    yield "validar_campana", lambda: motor.validar_campana(**tablas_campana)
+
+    # Las dos descargas en Excel de la aplicación: la tabla de Sample & Standards
+    # con sus colores y cualquier otro resultado (aquí, Intervals)
+    _, detalles = motor.validar_campana(**tablas_campana)
+    sample_standards = detalles["Sample & Standards"].iloc[:exportacion.FILAS_MAX_EXCEL]
+    intervalos = detalles["Intervals"].iloc[:exportacion.FILAS_MAX_EXCEL]
+    comprobar_profundidades(rutas["sample"], sample_standards)
+    yield "exportar_a_excel Sample & Standards", lambda: exportacion.exportar_a_excel(sample_standards)
+    yield "exportar Excel resultados", lambda: exportacion.FORMATOS["Excel"][2](intervalos)
+
+
+def entorno():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    versiones = {}
+    for modulo in ["pandas", "numpy", "pyarrow", "openpyxl"]:
+        try:
+            versiones[modulo] = __import__(modulo).__version__
+        except ImportError:
+            versiones[modulo] = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "motor_csv": motor.MOTOR_CSV,
+        **versiones,
+    }
+
+
+def comparar(actual, anterior):
+    # Razón de tiempos (actual / anterior) de las etapas medidas en ambas ejecuciones
+    if actual["parametros"] != anterior["parametros"]:
+        print("Aviso: las ejecuciones tienen parámetros distintos", anterior["parametros"])
+    previos = {(r["filas"], r["etapa"]): r for r in anterior["resultados"]}
+    print(f"\n{'filas':>10}  {'etapa':<38}{'antes (s)':>10}{'ahora (s)':>10}{'razón':>8}")
+    for r in actual["resultados"]:
+        previo = previos.get((r["filas"], r["etapa"]))
+        if previo:
+            razon = r["segundos_min"] / previo["segundos_min"] if previo["segundos_min"] else float("nan")
+            print(f"{r['filas']:>10,}  {r['etapa']:<38}{previo['segundos_min']:>10.3f}"
+                  f"{r['segundos_min']:>10.3f}{razon:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de lectura, validación y exportación")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--tramos", type=int, default=500, help="tramos por pozo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--lineas-malas", type=float, default=0.001, help="fracción de líneas mal formadas")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=os.path.join(os.path.dirname(__file__), "resultados"))
+    parser.add_argument("--comparar", metavar="JSON", help="resultados anteriores con los que comparar")
+    args = parser.parse_args(argv)
+
+    informe = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "entorno": entorno(),
+        "parametros": {
+            "tramos": args.tramos, "repeticiones": args.repeticiones, "encoding": args.encoding,
+            "lineas_malas": args.lineas_malas, "semilla": args.semilla,
+        },
+        "resultados": [],
+    }
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        comprobar_lectura_por_pozo(carpeta)
+
+    for filas in args.filas:
+        pozos = max(1, -(-filas // args.tramos))
+        with tempfile.TemporaryDirectory() as carpeta:
+            rutas = escribir_campana(carpeta, pozos, args.tramos, args.encoding, args.lineas_malas, args.semilla)
+            print(f"\n{filas:,} filas ({pozos:,} pozos)")
+            for etapa, funcion in etapas(rutas):
+                resultado = {"filas": filas, "etapa": etapa, **medir(funcion, args.repeticiones)}
+                informe["resultados"].append(resultado)
+                print(f"  {etapa:<38}{resultado['segundos_min']:>9.3f} s{resultado['pico_memoria_mb']:>10.1f} MB")
+
+    os.makedirs(args.salida, exist_ok=True)
+    ruta = os.path.join(args.salida, f"bench_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False, default=float)
+    print(f"\nResultados en {ruta}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(informe, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# Compara validar_geo contra la versión anterior basada en df.apply(axis=1)
+#
+# Uso: python benchmarks/bench_validar_geo.py [filas]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import motor_validacion as motor  # noqa: E402
+
+
+def validar_geo_apply(df, hole_number):
+    # Implementación original, fila por fila
+    df_filtrado = df[df["hole_number"] == hole_number].copy()
+    df_filtrado['validación_geo'] = df_filtrado.apply(
+        lambda row: 'correcto' if row['clito'] in motor.condiciones and row['unit'] in motor.condiciones[row['clito']]
+        else 'incorrecto', axis=1
+    )
+    return df_filtrado
+
+
+def generar_geology(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    clitos = np.array(list(motor.condiciones) + [99], dtype=object)
+    units = np.array(list(motor.correspondencias) + ["XX"], dtype=object)
+    desde = np.arange(filas) * 0.5
+    return pd.DataFrame({
+        "hole_number": "PECLD07",
+        "depth_from": desde,
+        "depth_to": desde + 0.5,
+        "clito": rng.choice(clitos, filas).astype("int64"),
+        "unit": rng.choice(units, filas),
+    })
+
+
+def cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    geology = generar_geology(filas)
+
+    t_apply, esperado = cronometrar(validar_geo_apply, geology, "PECLD07")
+    t_vector, obtenido = cronometrar(motor.validar_geo, geology, "PECLD07")
+
+    assert (esperado["validación_geo"].to_numpy() == obtenido["validación_geo"].to_numpy()).all()
+    print(f"filas: {filas:,}")
+    print(f"apply(axis=1): {t_apply:.3f} s")
+    print(f"vectorizado:   {t_vector:.3f} s")
+    print(f"aceleración:   {t_apply / t_vector:.0f}x")
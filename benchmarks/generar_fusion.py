@@ -0,0 +1,167 @@
+# Generador de tablas sintéticas del Fusion (Geology, Sample, Standards,
+# Alteration, Mine y Major) para pruebas de rendimiento.
+#
+# Uso: python benchmarks/generar_fusion.py carpeta [--pozos 100] [--tramos 500]
+#          [--encoding utf-16] [--lineas-malas 0.001] [--semilla 0]
+#
+# Los tramos de Sample son el eje de cada pozo: Geology, Alteration y Mine
+# comparten sus límites (salvo un pequeño porcentaje desplazado, que Intervals
+# debe marcar) y Major agrupa cada DIVISOR_MAJOR tramos de Geology. Los códigos
+# son mayormente válidos, con una fracción de errores para cada validador.
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import motor_validacion as motor  # noqa: E402
+
+
+# Tramos de Geology por intervalo de Major y tramos de Sample por standard
+DIVISOR_MAJOR = 10
+DIVISOR_STANDARDS = 20
+
+# Fracción de valores erróneos que se introducen en cada tabla
+FRACCION_ERRORES = 0.03
+
+# Pozos que se generan y escriben a la vez (acota la memoria del generador)
+POZOS_POR_BLOQUE = 200
+
+# Columnas que exporta el Fusion pero que ningún validador usa
+_COLUMNAS_EXTRA = {
+    "PROJECT": "PECL",
+    "LOGGED_BY": ["JPEREZ", "MROJAS", "LQUISPE"],
+    "COMMENTS": ["", "Fracturado", "Recuperación parcial del tramo"],
+}
+
+_CLITOS = np.array(list(motor.condiciones), dtype=np.int64)
+_UNITS_POR_CLITO = np.array([units[0] for units in motor.condiciones.values()], dtype=object)
+_UNITS = np.array(list(motor.correspondencias), dtype=object)
+_ROCK_TYPES = np.array(list(motor.correspondencias.values()), dtype=object)
+_INTENSIDADES = np.array(["FORT", "MODE", "FRCA", None], dtype=object)
+_DISTRIBUCION_CORRECTA = np.array(["PERV", None, "PUNT", None], dtype=object)
+_DISTRIBUCIONES = np.array(["PERV", "PUNT", "VEIN", None], dtype=object)
+_STANDARDS = np.array(["PECLSTD006", "PECLSTD007", "PECLBLK002", "PECLSTD010"], dtype=object)
+
+
+def _con_errores(rng, correctos, valores_erroneos):
+    # Reemplaza una fracción FRACCION_ERRORES de `correctos` por valores al azar
+    errores = rng.random(len(correctos)) < FRACCION_ERRORES
+    resultado = correctos.copy()
+    resultado[errores] = rng.choice(valores_erroneos, int(errores.sum()))
+    return resultado
+
+
+def _agregar_extra(rng, df):
+    for columna, valores in _COLUMNAS_EXTRA.items():
+        df[columna] = valores if isinstance(valores, str) else rng.choice(valores, len(df))
+    return df
+
+
+def generar_bloque(rng, primer_pozo, pozos, tramos):
+    # Tablas de `pozos` pozos consecutivos (numerados desde `primer_pozo`)
+    nombres = np.array([f"PECLD{primer_pozo + i:05d}" for i in range(pozos)], dtype=object)
+    filas = pozos * tramos
+    pozo = np.repeat(nombres, tramos)
+
+    # Sample: tramos de ~1 m, con algunos fuera del rango 0.5-1.5 m
+    largo = np.where(rng.random(filas) < 0.9, 1.0, np.round(rng.uniform(0.3, 2.0, filas), 2))
+    hasta = np.round(np.cumsum(largo.reshape(pozos, tramos), axis=1).ravel(), 2)
+    desde = np.round(hasta - largo, 2)
+    numero = primer_pozo * tramos * 2 + np.arange(filas)
+    tipo = rng.choice(np.array(["OR", "DP", "RG"], dtype=object), filas, p=[0.9, 0.05, 0.05])
+    sample = pd.DataFrame({
+        "HOLE_NUMBER": pozo, "SAMPLE_NUMBER": numero, "DEPTH_FROM": desde, "DEPTH_TO": hasta,
+        "ASSAY_SAMPLE_TYPE_CODE": tipo,
+        "PARENT_SAMPLE_NUMBER": np.where(tipo == "DP", numero - 1, np.nan),
+    })
+
+    def desplazar(profundidad):
+        # Límites de Sample con una fracción de ellos corridos 5 cm
+        return np.round(profundidad + np.where(rng.random(filas) < FRACCION_ERRORES, 0.05, 0.0), 2)
+
+    # Geology: CLITO/UNIT según `condiciones`, constantes dentro de cada intervalo
+    # de Major, con combinaciones inválidas
+    grupos = -(-filas // DIVISOR_MAJOR)
+    clito = np.repeat(rng.choice(_CLITOS, grupos), DIVISOR_MAJOR)[:filas]
+    clito = _con_errores(rng, clito, np.array([99, 1]))
+    posicion = pd.Index(_CLITOS).get_indexer(clito)
+    unit = _con_errores(rng, np.where(posicion >= 0, _UNITS_POR_CLITO[posicion], "XX"), _UNITS)
+    geology = pd.DataFrame({
+        "HOLE_NUMBER": pozo, "DEPTH_FROM": desplazar(desde), "DEPTH_TO": desplazar(hasta),
+        "CLITO": clito, "UNIT": unit,
+    })
+
+    # Alteration: distribución coherente con la intensidad, con errores
+    alteration = pd.DataFrame({"HOLE_NUMBER": pozo, "DEPTH_FROM": desplazar(desde), "DEPTH_TO": desplazar(hasta)})
+    for i in range(1, 4):
+        indice = rng.integers(0, len(_INTENSIDADES), filas)
+        alteration[f"INTENSITY_{i}"] = _INTENSIDADES[indice]
+        alteration[f"DISTRIBUTION_{i}"] = _con_errores(rng, _DISTRIBUCION_CORRECTA[indice], _DISTRIBUCIONES)
+
+    mine = pd.DataFrame({"HOLE_NUMBER": pozo, "DEPTH_FROM": desplazar(desde), "DEPTH_TO": desplazar(hasta)})
+
+    # Major: cada DIVISOR_MAJOR tramos, con el ROCK_TYPE_CODE de la UNIT del primero
+    inicio = np.arange(0, filas, DIVISOR_MAJOR)
+    fin = np.minimum(inicio + DIVISOR_MAJOR, filas) - 1
+    posicion = pd.Index(_UNITS).get_indexer(unit[inicio])
+    rock_type = np.where(posicion >= 0, _ROCK_TYPES[posicion], "XXXX").astype(object)
+    major = pd.DataFrame({
+        "HOLE_NUMBER": pozo[inicio], "DEPTH_FROM": desde[inicio], "DEPTH_TO": hasta[fin],
+        "ROCK_TYPE_CODE": _con_errores(rng, rock_type, np.unique(_ROCK_TYPES)),
+    })
+
+    # Standards: uno cada DIVISOR_STANDARDS tramos de Sample
+    cuantos = max(1, filas // DIVISOR_STANDARDS)
+    standards = pd.DataFrame({
+        "HOLE_NUMBER": rng.choice(nombres, cuantos),
+        "SAMPLE_NUMBER": primer_pozo * tramos * 2 + filas + np.arange(cuantos),
+        "ASSAY_STANDARD_CODE": rng.choice(_STANDARDS, cuantos),
+    })
+
+    tablas = {
+        "geology": geology, "sample": sample, "standards": standards,
+        "alteration": alteration, "mine": mine, "major": major,
+    }
+    return {nombre: _agregar_extra(rng, df) for nombre, df in tablas.items()}
+
+
+def _escribir_lineas_malas(rng, archivo, columnas, filas, fraccion):
+    # Líneas con campos de más, que leer_csv debe descartar (on_bad_lines="skip")
+    for _ in range(rng.binomial(filas, fraccion) if fraccion else 0):
+        archivo.write(",".join(["X"] * (columnas + 2)) + "\n")
+
+
+def escribir_campana(carpeta, pozos, tramos, encoding="utf-8", lineas_malas=0.0, semilla=0):
+    # Escribe los seis CSV en `carpeta` por bloques de pozos y devuelve {tabla: ruta}
+    os.makedirs(carpeta, exist_ok=True)
+    rng = np.random.default_rng(semilla)
+    rutas = {tabla: os.path.join(carpeta, f"{tabla}.csv") for tabla in motor.TABLAS}
+    archivos = {tabla: open(ruta, "w", encoding=encoding, newline="") for tabla, ruta in rutas.items()}
+    try:
+        for primer_pozo in range(0, pozos, POZOS_POR_BLOQUE):
+            bloque = generar_bloque(rng, primer_pozo, min(POZOS_POR_BLOQUE, pozos - primer_pozo), tramos)
+            for tabla, df in bloque.items():
+                df.to_csv(archivos[tabla], index=False, header=primer_pozo == 0)
+                _escribir_lineas_malas(rng, archivos[tabla], df.shape[1], len(df), lineas_malas)
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+    return rutas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera tablas sintéticas del Fusion")
+    parser.add_argument("carpeta")
+    parser.add_argument("--pozos", type=int, default=100)
+    parser.add_argument("--tramos", type=int, default=500, help="tramos de Sample por pozo")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--lineas-malas", type=float, default=0.0, help="fracción de líneas mal formadas")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    rutas = escribir_campana(args.carpeta, args.pozos, args.tramos, args.encoding, args.lineas_malas, args.semilla)
+    for tabla, ruta in rutas.items():
+        print(f"{tabla}: {ruta} ({os.path.getsize(ruta) / 2**20:.1f} MB)")
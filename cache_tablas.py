@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Caché LRU de tablas leídas con límite de memoria. Las tablas desalojadas se
+# vuelcan opcionalmente a Parquet en `directorio` y se recuperan desde ahí.
+# `max_bytes_disco` limita el tamaño de esa carpeta: al superarlo se borran
+# primero los archivos usados hace más tiempo.
+class CacheTablas:
+    def __init__(self, max_bytes, directorio=None, max_bytes_disco=None):
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco
+        self._tablas = OrderedDict()  # clave -> (df, bytes), en orden LRU
+        self._bytes = 0
+        self._lock = threading.RLock()
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+            # Los volcados de ejecuciones anteriores también cuentan para el límite
+            self._podar_disco()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.parquet")
+
+    def obtener(self, clave, solo_memoria=False):
+        with self._lock:
+            if clave in self._tablas:
+                self._tablas.move_to_end(clave)
+                return self._tablas[clave][0]
+
+        # Buscar en disco una tabla volcada anteriormente
+        if not solo_memoria and self.directorio and os.path.exists(self._ruta(clave)):
+            try:
+                df = pd.read_parquet(self._ruta(clave))
+                # Marcar el archivo como usado para que la poda lo conserve
+                os.utime(self._ruta(clave))
+            except Exception:
+                return None
+            self.guardar(clave, df)
+            return df
+        return None
+
+    def guardar(self, clave, df):
+        tamano = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if clave in self._tablas:
+                self._bytes -= self._tablas.pop(clave)[1]
+            self._tablas[clave] = (df, tamano)
+            self._bytes += tamano
+
+            # Desalojar las menos usadas (siempre se conserva la más reciente)
+            desalojadas = []
+            while self._bytes > self.max_bytes and len(self._tablas) > 1:
+                clave_vieja, (df_viejo, tamano_viejo) = self._tablas.popitem(last=False)
+                self._bytes -= tamano_viejo
+                desalojadas.append((clave_vieja, df_viejo))
+
+        for clave_vieja, df_viejo in desalojadas:
+            self._volcar(clave_vieja, df_viejo)
+
+    def _volcar(self, clave, df):
+        if not self.directorio or os.path.exists(self._ruta(clave)):
+            return
+        # Parquet requiere pyarrow; si no está disponible o la tabla tiene
+        # columnas con tipos mezclados, simplemente no se vuelca
+        ruta_tmp = self._ruta(clave) + ".tmp"
+        try:
+            df.to_parquet(ruta_tmp, index=False)
+            os.replace(ruta_tmp, self._ruta(clave))
+        except Exception:
+            if os.path.exists(ruta_tmp):
+                os.remove(ruta_tmp)
+            return
+        self._podar_disco()
+
+    def _podar_disco(self):
+        if not self.directorio or self.max_bytes_disco is None:
+            return
+        with self._lock:
+            archivos = []
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith(".parquet"):
+                    continue
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    info = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((info.st_mtime, info.st_size, ruta))
+
+            # Borrar los menos usados hasta volver a entrar en el límite
+            total = sum(tamano for _, tamano, _ in archivos)
+            for _, tamano, ruta in sorted(archivos):
+                if total <= self.max_bytes_disco:
+                    break
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    continue
+                total -= tamano
@@ -0,0 +1,118 @@
+# Exportación de resultados a Excel, construida por completo en memoria
+import importlib.util
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from instrumentacion import medir
+from motor_validacion import ErrorValidacion, profundidades
+
+
+# Filas máximas de una hoja de Excel (sin el encabezado)
+FILAS_MAX_EXCEL = 1_048_575
+
+# Formato del encabezado
+COLOR_ENCABEZADO = "FFC000"
+
+# Colores para tipo_muestra
+COLORES_TIPO_MUESTRA = {
+    "PECLSTD006": "F7F99F",
+    "PECLSTD007": "3785BF",
+    "RG": "F0DEF2",
+    "DP": "B5E6A2"
+}
+
+
+def _relleno(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+def _valores_celda(serie):
+    # openpyxl no acepta NaN/NA: las celdas vacías se escriben como None
+    if serie.dtype == "float32":
+        serie = pd.Series(profundidades(serie))
+    valores = serie.to_numpy(dtype=object, copy=True)
+    valores[pd.isna(valores)] = None
+    return valores
+
+
+@medir()
+def exportar_a_excel(df, hoja="Resultados"):
+    # Devuelve el .xlsx como bytes. Las filas se escriben en modo streaming
+    # (write_only) y los colores se expresan como reglas de formato condicional
+    # sobre rangos completos, en lugar de aplicar un relleno celda por celda.
+    comprobar_exportable(df, "Excel")
+    try:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(hoja)
+
+        sheet.append([str(columna).upper() for columna in df.columns])
+        for fila in zip(*(_valores_celda(df[columna]) for columna in df.columns)):
+            sheet.append(fila)
+
+        ultima_fila = len(df) + 1
+        ultima_columna = get_column_letter(max(len(df.columns), 1))
+        sheet.conditional_formatting.add(
+            f"A1:{ultima_columna}1",
+            FormulaRule(formula=["TRUE"], fill=_relleno(COLOR_ENCABEZADO), font=Font(bold=True))
+        )
+
+        if "tipo_muestra" in df.columns and len(df):
+            letra = get_column_letter(df.columns.get_loc("tipo_muestra") + 1)
+            for valor, color in COLORES_TIPO_MUESTRA.items():
+                sheet.conditional_formatting.add(
+                    f"{letra}2:{letra}{ultima_fila}",
+                    CellIsRule(operator="equal", formula=[f'"{valor}"'], fill=_relleno(color))
+                )
+
+        salida = io.BytesIO()
+        workbook.save(salida)
+        return salida.getvalue()
+    except Exception as e:
+        raise ErrorValidacion(f"Error al exportar a Excel: {e}") from e
+
+
+@medir()
+def exportar_a_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+@medir()
+def exportar_a_parquet(df):
+    # Requiere pyarrow. Las columnas de texto con tipos mezclados (p. ej. números
+    # y textos en la misma columna) se convierten a texto para poder escribirlas.
+    salida = io.BytesIO()
+    try:
+        df.to_parquet(salida, index=False)
+    except ImportError as e:
+        raise ErrorValidacion(f"Error al exportar a Parquet: {e}") from e
+    except Exception:
+        texto = {columna: "string" for columna in df.columns if df[columna].dtype == object}
+        salida = io.BytesIO()
+        df.astype(texto).to_parquet(salida, index=False)
+    return salida.getvalue()
+
+
+def comprobar_exportable(df, formato):
+    # Las descargas se generan al hacer clic, fuera del script, donde un error ya
+    # no se puede mostrar: lo que se sabe de antemano que fallará se revisa aquí
+    if formato == "Excel" and len(df) > FILAS_MAX_EXCEL:
+        raise ErrorValidacion(
+            f"Error al exportar a Excel: {len(df):,} filas superan el máximo de una hoja ({FILAS_MAX_EXCEL:,}). "
+            "Elija CSV o Parquet."
+        )
+    if formato == "Parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ErrorValidacion("Error al exportar a Parquet: pyarrow no está instalado. Elija CSV o Excel.")
+    return True
+
+
+# Formatos de descarga: nombre -> (extensión, tipo MIME, función que genera los bytes)
+FORMATOS = {
+    "CSV": (".csv", "text/csv", exportar_a_csv),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", exportar_a_parquet),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", exportar_a_excel),
+}
@@ -0,0 +1,187 @@
+# Medición por etapa (lectura, filtro por pozo, validadores, exportación,
+# gráficos): tiempo, filas de entrada y salida y pico de memoria.
+#
+# Cada etapa medida se agrega al recolector de la ejecución en curso (si hay uno,
+# ver iniciar_recoleccion) y se emite como una línea JSON en el logger
+# "logueo.diagnostico".
+#
+# Memoria de cada etapa:
+# - Con tracemalloc activo (es costoso), pico_memoria_mb: el pico de lo asignado
+#   durante la etapa sobre lo que había al empezar. El pico de tracemalloc es
+#   global: solo se reinicia si ningún otro hilo tiene una etapa abierta. Si otro
+#   hilo la tiene (p. ej. las lecturas en paralelo), pico_compartido indica que el
+#   pico incluye lo asignado por esas etapas y desde el último reinicio.
+# - Si no, rss_delta_mb: cuánto cambió el RSS del proceso durante la etapa (solo
+#   donde existe /proc, p. ej. Linux), y rss_max_incremento_mb: cuánto subió la
+#   etapa el máximo de RSS del proceso (0 si no lo superó). Ambos son del proceso
+#   completo e incluyen lo que hagan otros hilos a la vez.
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+logger = logging.getLogger("logueo.diagnostico")
+
+_recolector = contextvars.ContextVar("recolector_etapas", default=None)
+_pila = contextvars.ContextVar("pila_etapas", default=())
+
+# Etapas abiertas por hilo, para no reiniciar el pico de tracemalloc de otro hilo
+_abiertas = {}
+_lock_abiertas = threading.Lock()
+
+
+def iniciar_recoleccion():
+    # Lista donde se acumulan las etapas medidas desde aquí en este contexto
+    # (y en los hilos lanzados con contextvars.copy_context)
+    etapas = []
+    _recolector.set(etapas)
+    return etapas
+
+
+def configurar_log(ruta):
+    # Agrega las etapas como líneas JSON al archivo `ruta`
+    manejador = logging.FileHandler(ruta, encoding="utf-8")
+    manejador.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(manejador)
+    logger.setLevel(logging.INFO)
+    return manejador
+
+
+def _rss_mb():
+    # RSS actual del proceso; None donde no existe /proc
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _rss_max_mb():
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En bytes en macOS y en KB en Linux
+    return maximo / 2**20 if sys.platform == "darwin" else maximo / 1024
+
+
+def _abrir_etapa():
+    # Registra una etapa abierta en este hilo; devuelve si es el único hilo con etapas abiertas
+    hilo = threading.get_ident()
+    with _lock_abiertas:
+        unico = not any(abiertas for otro, abiertas in _abiertas.items() if otro != hilo)
+        _abiertas[hilo] = _abiertas.get(hilo, 0) + 1
+    return unico
+
+
+def _cerrar_etapa():
+    hilo = threading.get_ident()
+    with _lock_abiertas:
+        _abiertas[hilo] -= 1
+        if not _abiertas[hilo]:
+            del _abiertas[hilo]
+
+
+def _publicar(info):
+    registro = {clave: valor for clave, valor in info.items() if not clave.startswith("_")}
+    etapas = _recolector.get()
+    if etapas is not None:
+        etapas.append(registro)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+@contextlib.contextmanager
+def etapa(nombre, **datos):
+    # Mide el bloque. `datos` (p. ej. filas_entrada) y lo que se agregue al
+    # diccionario devuelto (p. ej. filas_salida) se publican con la medición.
+    pila = _pila.get()
+    padre = pila[-1] if pila else None
+    info = {"etapa": nombre, "nivel": len(pila), "inicio": time.time(), **datos}
+
+    unico = _abrir_etapa()
+    trazando = tracemalloc.is_tracing()
+    if trazando:
+        # El pico se reinicia para la etapa; el del padre se conserva en su registro
+        actual, pico = tracemalloc.get_traced_memory()
+        if padre is not None and "_pico" in padre:
+            padre["_pico"] = max(padre["_pico"], pico)
+        if unico:
+            tracemalloc.reset_peak()
+        else:
+            info["pico_compartido"] = True
+        info["_base"] = info["_pico"] = actual
+    else:
+        rss, rss_max = _rss_mb(), _rss_max_mb()
+
+    token = _pila.set(pila + (info,))
+    inicio = time.perf_counter()
+    try:
+        yield info
+    except Exception as e:
+        info["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        info["segundos"] = time.perf_counter() - inicio
+        _pila.reset(token)
+        _cerrar_etapa()
+        if trazando and tracemalloc.is_tracing():
+            info["_pico"] = max(info["_pico"], tracemalloc.get_traced_memory()[1])
+            info["pico_memoria_mb"] = (info["_pico"] - info["_base"]) / 2**20
+            if padre is not None and "_pico" in padre:
+                padre["_pico"] = max(padre["_pico"], info["_pico"])
+        elif not trazando:
+            if rss is not None:
+                info["rss_delta_mb"] = _rss_mb() - rss
+            if rss_max is not None:
+                info["rss_max_incremento_mb"] = _rss_max_mb() - rss_max
+        _publicar(info)
+
+
+def _filas(valor):
+    # Filas de un DataFrame, o del primero de una tupla de resultados
+    if isinstance(valor, pd.DataFrame):
+        return len(valor)
+    if isinstance(valor, tuple):
+        return next((len(v) for v in valor if isinstance(v, pd.DataFrame)), None)
+    return None
+
+
+# Argumentos que, si la función los recibe, se publican con la etapa para identificarla
+ETIQUETAS = ("tabla", "hole_number", "tipo")
+
+
+def medir(nombre=None):
+    # Decorador: mide cada llamada como una etapa, con las filas de los DataFrame
+    # recibidos como entrada y las del resultado como salida
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+        etiquetas = [parametro for parametro in ETIQUETAS if parametro in firma.parameters]
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            filas = [len(a) for a in (*args, *kwargs.values()) if isinstance(a, pd.DataFrame)]
+            datos = {}
+            if etiquetas:
+                argumentos = firma.bind_partial(*args, **kwargs).arguments
+                datos = {etiqueta: argumentos[etiqueta] for etiqueta in etiquetas if etiqueta in argumentos}
+            with etapa(nombre or funcion.__name__, filas_entrada=sum(filas) if filas else None, **datos) as info:
+                resultado = funcion(*args, **kwargs)
+                info["filas_salida"] = _filas(resultado)
+                return resultado
+        return envoltura
+    return decorador
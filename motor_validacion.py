@@ -0,0 +1,1201 @@
+# Motor de validación de los datos del Fusion, independiente de la interfaz.
+# Los validadores lanzan ErrorValidacion/AvisoValidacion en lugar de mostrar
+# mensajes; la aplicación Streamlit y la línea de comandos deciden cómo informarlos.
+import codecs
+import contextvars
+import hashlib
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import chardet
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+from almacen_veredictos import huella_tabla
+from instrumentacion import medir
+
+
+class ErrorValidacion(Exception):
+    pass
+
+
+class AvisoValidacion(ErrorValidacion):
+    # Situaciones que la interfaz muestra como advertencia (p. ej. pozo sin datos)
+    pass
+
+
+# Filas por bloque en la lectura por pozo: la memoria crece con el tamaño de un
+# bloque más las filas del pozo, no con el tamaño del archivo de campaña
+TAMANO_BLOQUE = 200_000
+
+
+def _nombre(archivo):
+    return getattr(archivo, "name", archivo)
+
+
+# Bytes del inicio del archivo con los que se detecta el encoding
+BYTES_MUESTRA_ENCODING = 64 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# El lector de pyarrow libera el GIL y usa varios hilos; si no está instalado se
+# usa el de pandas. La lectura por bloques siempre usa el de pandas (chunksize).
+MOTOR_CSV = "pyarrow" if pa is not None else "c"
+
+
+def _rebobinar(archivo):
+    # `archivo` puede ser una ruta o un archivo abierto (p. ej. un archivo subido)
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+
+
+def detectar_encoding(archivo):
+    # Encoding del CSV a partir de sus primeros bytes, para analizarlo una sola vez:
+    # BOM, luego UTF-16 sin BOM (bytes nulos alternados), luego utf-8 y por último chardet.
+    # Lo que no se pueda decodificar más adelante en el archivo se reemplaza (encoding_errors).
+    if hasattr(archivo, "read"):
+        _rebobinar(archivo)
+        prefijo = archivo.read(BYTES_MUESTRA_ENCODING)
+        _rebobinar(archivo)
+    else:
+        with open(archivo, "rb") as f:
+            prefijo = f.read(BYTES_MUESTRA_ENCODING)
+
+    for bom, encoding in _BOMS:
+        if prefijo.startswith(bom):
+            return encoding
+    if prefijo[1::2].count(0) > len(prefijo) // 4:
+        return "utf-16-le"
+    if prefijo[0::2].count(0) > len(prefijo) // 4:
+        return "utf-16-be"
+    try:
+        # Decodificador incremental: un carácter cortado al final del prefijo no es un error
+        codecs.getincrementaldecoder("utf-8")().decode(prefijo, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Con pocos bytes chardet puede proponer encodings que no son compatibles con
+    # ASCII (p. ej. EBCDIC); los encabezados del Fusion son ASCII, así que en ese
+    # caso se usa latin-1, que decodifica cualquier byte
+    encoding = chardet.detect(prefijo)["encoding"]
+    if not encoding or encoding.lower() == "ascii":
+        return "utf-8"
+    try:
+        if "hole_number".encode(encoding) == b"hole_number":
+            return encoding
+    except LookupError:
+        pass
+    return "latin-1"
+
+
+# Esquema de cada tabla del Fusion: solo las columnas que usa algún validador.
+# Los códigos se cargan como categóricos y las profundidades como float32; las
+# columnas con tipo None se dejan a la inferencia de pandas.
+_CATEGORIA = "category"
+_PROFUNDIDAD = "float32"
+
+ESQUEMAS = {
+    "geology": {
+        "hole_number": _CATEGORIA, "depth_from": _PROFUNDIDAD, "depth_to": _PROFUNDIDAD,
+        "clito": _CATEGORIA, "unit": _CATEGORIA,
+    },
+    "sample": {
+        "hole_number": _CATEGORIA, "sample_number": None, "depth_from": _PROFUNDIDAD, "depth_to": _PROFUNDIDAD,
+        "assay_sample_type_code": _CATEGORIA, "parent_sample_number": None,
+    },
+    "standards": {
+        "hole_number": _CATEGORIA, "sample_number": None, "assay_standard_code": _CATEGORIA,
+    },
+    "alteration": {
+        "hole_number": _CATEGORIA, "depth_from": _PROFUNDIDAD, "depth_to": _PROFUNDIDAD,
+        **{f"{columna}_{i}": _CATEGORIA for columna in ("intensity", "distribution") for i in range(1, 4)},
+    },
+    "mine": {
+        "hole_number": _CATEGORIA, "depth_from": _PROFUNDIDAD, "depth_to": _PROFUNDIDAD,
+    },
+    "major": {
+        "hole_number": _CATEGORIA, "depth_from": _PROFUNDIDAD, "depth_to": _PROFUNDIDAD,
+        "rock_type_code": _CATEGORIA,
+    },
+}
+
+
+def _opciones_esquema(archivo, encoding, esquema):
+    # Columnas a leer y tipos de los categóricos, con los nombres tal como vienen
+    # en el encabezado del archivo (sin normalizar)
+    if esquema is None:
+        return {}
+    encabezado = pd.read_csv(archivo, encoding=encoding, encoding_errors="replace", nrows=0).columns
+    _rebobinar(archivo)
+    columnas = [c for c in encabezado if c.strip().lower() in esquema]
+    return {
+        "usecols": columnas,
+        "dtype": {c: _CATEGORIA for c in columnas if esquema[c.strip().lower()] == _CATEGORIA},
+    }
+
+
+def _aplicar_esquema(df, esquema):
+    df.columns = df.columns.str.strip().str.lower()
+    if esquema is None:
+        return df
+    for columna in df.columns:
+        tipo = esquema.get(columna)
+        if tipo == _PROFUNDIDAD:
+            # Un valor no numérico queda como NaN y el tramo no se considera válido
+            df[columna] = pd.to_numeric(df[columna], errors="coerce").astype(np.float32)
+        elif tipo == _CATEGORIA:
+            if not isinstance(df[columna].dtype, pd.CategoricalDtype):
+                df[columna] = df[columna].astype(_CATEGORIA)
+    return df
+
+
+def profundidades(serie):
+    # Profundidades en float64 para operar. Las float32 del esquema se redondean a
+    # los 7 dígitos significativos que conservan, para recuperar el valor escrito
+    # en el archivo (12.3 y no 12.300000190734863)
+    valores = serie.to_numpy(dtype=float)
+    if serie.dtype != np.float32:
+        return valores
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitud = np.floor(np.log10(np.abs(valores)))
+    escala = 10.0 ** np.where(np.isfinite(magnitud), 6 - magnitud, 0)
+    return np.round(valores * escala) / escala
+
+
+def _recodificar_utf8(flujo, encoding):
+    # pyarrow no reemplaza los bytes que no se pueden decodificar (encoding_errors):
+    # se le entrega el archivo ya recodificado a UTF-8 válido
+    return codecs.StreamRecoder(
+        flujo, codecs.getencoder("utf-8"), codecs.getdecoder("utf-8"),
+        codecs.getreader(encoding), codecs.getwriter("utf-8"), errors="replace"
+    )
+
+
+def _tabla_pyarrow(archivo, encoding, opciones, recodificar):
+    # Los códigos se leen como texto, sin inferir su tipo: un HOLE_NUMBER 0123 no
+    # es el número 123 (igual que en el lector de pandas)
+    flujo = archivo if hasattr(archivo, "read") else open(archivo, "rb")
+    try:
+        return pa_csv.read_csv(
+            _recodificar_utf8(flujo, encoding) if recodificar else flujo,
+            parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda fila: "skip"),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=opciones.get("usecols"),
+                column_types={columna: pa.string() for columna in opciones.get("dtype", {})},
+                strings_can_be_null=True,
+            ),
+        )
+    finally:
+        if flujo is not archivo:
+            flujo.close()
+
+
+def _leer_con_pyarrow(archivo, encoding, opciones):
+    # Un archivo UTF-8 se entrega tal cual; si más allá de la muestra del encoding
+    # tiene bytes inválidos, se vuelve a leer recodificado
+    try:
+        tabla = _tabla_pyarrow(archivo, encoding, opciones, recodificar=encoding != "utf-8")
+    except pa.ArrowInvalid:
+        if encoding != "utf-8":
+            raise
+        _rebobinar(archivo)
+        tabla = _tabla_pyarrow(archivo, encoding, opciones, recodificar=True)
+    # Los códigos llegan a pandas como categóricos
+    for columna in opciones.get("dtype", {}):
+        tabla = tabla.set_column(
+            tabla.schema.get_field_index(columna), columna, tabla[columna].dictionary_encode()
+        )
+    return tabla.to_pandas()
+
+
+def _leer_completo(archivo, encoding, esquema=None):
+    opciones = _opciones_esquema(archivo, encoding, esquema)
+    if MOTOR_CSV == "pyarrow":
+        df = _leer_con_pyarrow(archivo, encoding, opciones)
+    else:
+        # Sin usecols: con usecols pandas no descarta las líneas con campos de más
+        # (on_bad_lines) y las mezcla con los datos. Las columnas se eligen después.
+        df = pd.read_csv(
+            archivo, encoding=encoding, encoding_errors="replace", on_bad_lines="skip", dtype=opciones.get("dtype")
+        )
+        if "usecols" in opciones:
+            df = df[opciones["usecols"]]
+    return _aplicar_esquema(df, esquema)
+
+
+def _leer_por_bloques(archivo, encoding, pozos, esquema=None):
+    # Recorre el CSV por bloques y conserva solo las filas de los pozos pedidos.
+    # Cada bloque trae sus propias categorías: el esquema se vuelve a aplicar al final.
+    opciones = _opciones_esquema(archivo, encoding, esquema)
+    partes = []
+    with pd.read_csv(
+        archivo, encoding=encoding, encoding_errors="replace", on_bad_lines="skip", chunksize=TAMANO_BLOQUE, **opciones
+    ) as lector:
+        for bloque in lector:
+            bloque.columns = bloque.columns.str.strip().str.lower()
+            partes.append(bloque[bloque["hole_number"].isin(pozos)])
+    df = pd.concat(partes, ignore_index=True)
+    # Los códigos de bloques con categorías distintas se unen como object: quedan
+    # como texto (un HOLE_NUMBER 0007 no es el número 7)
+    codigos = [c for c in df.columns if esquema is not None and esquema.get(c) == _CATEGORIA]
+    for columna in codigos:
+        df[columna] = df[columna].where(df[columna].isna(), df[columna].astype(str))
+    # En un bloque con líneas mal formadas (que pandas no descarta al leer por
+    # bloques) las columnas numéricas se leen como texto: se vuelven a inferir
+    # con las filas que quedaron, como en la lectura completa
+    for columna in df.columns:
+        if columna in codigos or pd.api.types.is_numeric_dtype(df[columna]):
+            continue
+        numeros = pd.to_numeric(df[columna], errors="coerce")
+        if numeros.notna().sum() == df[columna].notna().sum():
+            df[columna] = numeros
+    return _aplicar_esquema(df, esquema)
+
+
+def clave_pozos(pozos):
+    # Identificador corto y estable de un conjunto de pozos (para claves de caché)
+    return hashlib.blake2b("\x1f".join(map(repr, pozos)).encode(), digest_size=8).hexdigest()
+
+
+@medir()
+def leer_csv(archivo, pozos=None, tabla=None):
+    # Lee un CSV del Fusion con los nombres de columnas normalizados. Con `pozos`,
+    # lo recorre por bloques y devuelve solo las filas de esos HOLE_NUMBER. Con
+    # `tabla` (una clave de ESQUEMAS), lee solo sus columnas y con tipos compactos.
+    if archivo is None:
+        raise ErrorValidacion("Error: No se ha subido ningún archivo.")
+
+    esquema = None if tabla is None else ESQUEMAS[tabla]
+    try:
+        encoding = detectar_encoding(archivo)
+        if pozos is None:
+            df = _leer_completo(archivo, encoding, esquema)
+        else:
+            df = _leer_por_bloques(archivo, encoding, list(dict.fromkeys(pozos)), esquema)
+    except Exception as e:
+        raise ErrorValidacion(f"Error al leer el archivo {_nombre(archivo)}: {e}") from e
+
+    # Un resultado vacío por pozo no es un error: los validadores avisan que no hay datos del pozo
+    if pozos is None and df.empty:
+        raise ErrorValidacion(f"Error: El archivo {_nombre(archivo)} está vacío.")
+
+    return df
+
+
+# Filas que se leen sin esquema para estimar la memoria que ocuparía la tabla completa
+FILAS_MUESTRA_MEMORIA = 10_000
+
+
+@medir()
+def informe_memoria(archivo, df, tabla):
+    # Memoria de la tabla leída con su esquema frente a la estimada sin él (todas
+    # las columnas con los tipos que infiere pandas), extrapolada de una muestra
+    encoding = detectar_encoding(archivo)
+    muestra = pd.read_csv(
+        archivo, encoding=encoding, encoding_errors="replace", on_bad_lines="skip", nrows=FILAS_MUESTRA_MEMORIA
+    )
+    _rebobinar(archivo)
+    por_fila = muestra.memory_usage(deep=True).sum() / max(len(muestra), 1)
+    return {
+        "tabla": tabla,
+        "filas": len(df),
+        "columnas": f"{df.shape[1]} de {muestra.shape[1]}",
+        "memoria_mb": df.memory_usage(deep=True).sum() / 2**20,
+        "memoria_sin_esquema_mb": por_fila * len(df) / 2**20,
+    }
+
+
+def leer_en_paralelo(archivos, pozos=None):
+    # Lee varias tablas a la vez, una por hilo: el tiempo total es el del archivo
+    # más grande y no la suma. `archivos` es {nombre en ESQUEMAS: archivo}; devuelve
+    # {nombre: Future} para que quien llama decida cómo informar cada error.
+    with ThreadPoolExecutor(max_workers=max(1, len(archivos))) as ejecutor:
+        return {
+            # Cada hilo con una copia del contexto, para que sus mediciones lleguen al mismo recolector
+            tabla: ejecutor.submit(contextvars.copy_context().run, leer_csv, archivo, pozos, tabla)
+            for tabla, archivo in archivos.items()
+        }
+
+# Índice hole_number -> posiciones de fila, construido una sola vez por tabla
+# cargada y compartido por todos los validadores
+_indices_pozo = {}
+
+
+def indice_pozo(df):
+    clave = id(df)
+    entrada = _indices_pozo.get(clave)
+    if entrada is None or entrada[0]() is not df:
+        posiciones = df.groupby("hole_number", sort=False, observed=True).indices
+        referencia = weakref.ref(df, lambda _: _indices_pozo.pop(clave, None))
+        entrada = (referencia, posiciones)
+        _indices_pozo[clave] = entrada
+    return entrada[1]
+
+
+@medir()
+def filtrar_pozo(df, hole_number):
+    posiciones = indice_pozo(df).get(hole_number)
+    if posiciones is None:
+        return df.iloc[0:0]
+    return df.iloc[posiciones]
+
+
+@medir()
+def filtrar_pozos(df, pozos):
+    # Filas de varios pozos, en el orden de `pozos`
+    indice = indice_pozo(df)
+    posiciones = [indice[pozo] for pozo in pozos if pozo in indice]
+    if not posiciones:
+        return df.iloc[0:0]
+    return df.iloc[np.concatenate(posiciones)]
+
+# Combinaciones válidas de CLITO y UNIT en Geology
+condiciones = {
+    31: ["VD"], 3: ["D", "D1"], 37: ["VAND"], 2: ["VL"], 28: ["VM"], 
+    6: ["SPP"], 7: ["SOP"], 9: ["SPB"], 10: ["SOB"], 25: ["SSL"], 
+    5: ["SSM"], 34: ["BXMM"], 30: ["I"], 14: ["P"], 8: ["BXC"], 
+    32: ["VRD"], 33: ["VRD"], 12: ["CO"], 13: ["Q"], 17: ["LOST"], 15: ["F"]
+}
+
+
+def codigos_en_tabla(serie, valores, numerico=False):
+    # Posición de cada elemento de la columna dentro de `valores` (-1 si no está).
+    # En columnas categóricas se reutilizan sus códigos; en las demás se factoriza
+    # primero, de modo que la búsqueda en `valores` se hace solo sobre los únicos.
+    # Con `numerico`, los únicos se comparan como números ("31" y "31.0" son 31).
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie)
+    if numerico:
+        unicos = pd.to_numeric(pd.Series(unicos, dtype=object), errors="coerce")
+    posiciones = pd.Index(valores).get_indexer(unicos)
+    return np.where(codigos >= 0, posiciones[codigos], -1)
+
+
+# `condiciones` compilado a una matriz booleana CLITO x UNIT
+_CLITOS_GEO = list(condiciones)
+_UNITS_GEO = list(dict.fromkeys(unit for units in condiciones.values() for unit in units))
+_TABLA_GEO = np.zeros((len(_CLITOS_GEO), len(_UNITS_GEO)), dtype=bool)
+for _clito, _units in condiciones.items():
+    for _unit in _units:
+        _TABLA_GEO[_CLITOS_GEO.index(_clito), _UNITS_GEO.index(_unit)] = True
+
+
+def validacion_geo(df):
+    clitos = codigos_en_tabla(df["clito"], _CLITOS_GEO, numerico=True)
+    units = codigos_en_tabla(df["unit"], _UNITS_GEO)
+    correcto = (clitos >= 0) & (units >= 0) & _TABLA_GEO[clitos, units]
+    return pd.Categorical.from_codes(correcto.astype(np.int8), ["incorrecto", "correcto"])
+
+
+@medir()
+def validar_geo(df, hole_number, almacen=None):
+    if df is None:
+        raise ErrorValidacion("⚠️ Error: No se pudo cargar el archivo Geology correctamente.")
+
+    df.columns = df.columns.str.strip().str.lower()  # Normalizar nombres de columnas
+    
+    # Filtrar por HOLE_NUMBER
+    df_filtrado = filtrar_pozo(df, hole_number)
+
+    if df_filtrado.empty:
+        raise AvisoValidacion(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
+
+    if almacen is None:
+        df_filtrado['validación_geo'] = validacion_geo(df_filtrado)
+    else:
+        # Solo se validan las filas nuevas o editadas desde la última validación
+        veredictos = almacen.veredictos(
+            "geology", df_filtrado, ["clito", "unit"],
+            lambda filas: pd.DataFrame({'validación_geo': validacion_geo(filas)})
+        )
+        df_filtrado['validación_geo'] = veredictos['validación_geo'].array
+
+    return df_filtrado
+
+# Tabla de Sample y Standards con la validación de tramo, para uno o varios pozos
+def tabla_sample_standards(sample, standards):
+    # DataFrame para Sample
+    df_sample = sample[['hole_number', 'sample_number', 'depth_from', 'depth_to', 'assay_sample_type_code','parent_sample_number']].copy()
+    df_sample['tipo_muestra'] = df_sample['assay_sample_type_code']
+    # En float64 con el valor escrito en el archivo: al unir con los Standards (sin
+    # profundidad) la columna pasa a object y un float32 se mostraría ensanchado
+    df_sample['depth_from'] = profundidades(df_sample['depth_from'])
+    df_sample['depth_to'] = profundidades(df_sample['depth_to'])
+    df_sample['depth_range'] = df_sample['depth_to'] - df_sample['depth_from']
+    df_sample['tramo_valido'] = np.where(df_sample['depth_range'].between(0.5, 1.5), '✅ Correcto', '⚠️ Observado')
+    df_sample = df_sample.drop(columns=['assay_sample_type_code'])
+
+    # DataFrame para Standards (sin validación de tramo)
+    df_standards = standards[['hole_number', 'sample_number', 'assay_standard_code']].copy()
+    df_standards['tipo_muestra'] = df_standards['assay_standard_code']
+    df_standards['depth_from'] = None
+    df_standards['depth_to'] = None
+    df_standards['depth_range'] = None
+    df_standards['tramo_valido'] = None
+    df_standards = df_standards.drop(columns=['assay_standard_code'])
+
+    # Unir ambos DataFrames
+    resultado = pd.concat([df_sample, df_standards], ignore_index=True)
+    resultado = resultado.drop_duplicates(subset=['hole_number', 'sample_number', 'tipo_muestra'])
+    resultado = resultado.sort_values(by=['hole_number', 'sample_number'], ascending=True)
+
+    # Reordenar columnas para visualización
+    columnas_finales = [
+        'hole_number', 'sample_number', 'tipo_muestra', 'parent_sample_number',
+        'depth_from', 'depth_to', 'depth_range', 'tramo_valido'
+    ]
+    return resultado[columnas_finales]
+
+
+# Función para validar Sample y Standards
+
+@medir()
+def validar_sample_standards(sample_df, standards_df, hole_number):
+    try:
+        sample_df.columns = sample_df.columns.str.strip().str.lower()
+        standards_df.columns = standards_df.columns.str.strip().str.lower()
+
+        # Filtrar por HOLE_NUMBER
+        sample_filtered = filtrar_pozo(sample_df, hole_number)
+        standards_filtered = filtrar_pozo(standards_df, hole_number)
+
+        return tabla_sample_standards(sample_filtered, standards_filtered)
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error en validar_sample_standards: {e}") from e
+
+
+COLUMNAS_ALTERATION = ['hole_number', 'intensity_1', 'intensity_2', 'intensity_3', 
+                       'distribution_1', 'distribution_2', 'distribution_3']
+
+
+# Reglas de cada par intensity_i/distribution_i, en el orden en que se informan
+REGLAS_ALTERATION = [
+    ("FORT", "esperado PERV"),
+    ("MODE", "esperado vacío"),
+    ("FRCA", "esperado PUNT o VEIN"),
+]
+
+# Mensaje de cada bit de la máscara: bit 3*(i-1)+r corresponde a la regla r del par i
+_MENSAJES_ALTERATION = [
+    f"Incorrecto en intensity_{i} y distribution_{i} ({esperado})"
+    for i in range(1, 4) for _, esperado in REGLAS_ALTERATION
+]
+
+
+def mascara_alteration(df):
+    # Evalúa las tres reglas sobre los tres pares a la vez, con matrices (filas x 3)
+    # de códigos enteros, y devuelve una máscara de bits por fila (0 = correcto)
+    intensidad = np.column_stack([
+        codigos_en_tabla(df[f'intensity_{i}'], [codigo for codigo, _ in REGLAS_ALTERATION]) for i in range(1, 4)
+    ])
+    distribucion = np.column_stack([
+        codigos_en_tabla(df[f'distribution_{i}'], ["PERV", "PUNT", "VEIN"]) for i in range(1, 4)
+    ])
+    vacia = np.column_stack([df[f'distribution_{i}'].isna().to_numpy() for i in range(1, 4)])
+
+    fallas = np.stack([
+        (intensidad == 0) & (distribucion != 0),   # FORT sin PERV
+        (intensidad == 1) & ~vacia,                # MODE con distribución
+        (intensidad == 2) & (distribucion < 1),    # FRCA sin PUNT ni VEIN
+    ], axis=2)  # filas x par x regla
+
+    pesos = (1 << np.arange(9, dtype=np.uint16)).reshape(3, 3)
+    return (fallas * pesos).sum(axis=(1, 2)).astype(np.uint16)
+
+
+def mensaje_alteration(mascara):
+    errores = [mensaje for bit, mensaje in enumerate(_MENSAJES_ALTERATION) if mascara >> bit & 1]
+    return " | ".join(errores) if errores else "Correcto"
+
+
+def validacion_alteration(df, mascara=None):
+    # Texto de validación por fila. Los mensajes se arman solo para las
+    # combinaciones de errores presentes, no para cada fila.
+    if mascara is None:
+        mascara = mascara_alteration(df)
+    valores, codigos = np.unique(mascara, return_inverse=True)
+    return pd.Categorical.from_codes(codigos.ravel(), [mensaje_alteration(valor) for valor in valores])
+
+
+# Función para validar Alteration
+@medir()
+def validar_alteration(alteration_df, hole_number, con_mascara=False, almacen=None):
+    try:
+        if alteration_df is None:
+            raise ErrorValidacion("⚠️ Error: No se pudo cargar el archivo Alteration correctamente.")
+
+        alteration_df.columns = alteration_df.columns.str.strip().str.lower()
+
+        missing_columns = [col for col in COLUMNAS_ALTERATION if col not in alteration_df.columns]
+
+        if missing_columns:
+            raise ErrorValidacion(f"El archivo ALTERATION tiene columnas faltantes: {missing_columns}")
+
+        # 🔹 Filtrar el DataFrame por `hole_number` antes de validar, asegurando que sea una copia independiente
+        alteration_filtrado = filtrar_pozo(alteration_df, hole_number).copy()
+
+        if alteration_filtrado.empty:
+            raise AvisoValidacion(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
+
+        # 🔹 Aplicar la validación **solo a las filas filtradas**
+        if almacen is None:
+            mascara = mascara_alteration(alteration_filtrado)
+        else:
+            # Solo se evalúan las filas nuevas o editadas; el resto reutiliza su máscara
+            mascara = almacen.veredictos(
+                "alteration", alteration_filtrado, COLUMNAS_ALTERATION[1:],
+                lambda filas: pd.DataFrame({'mascara': mascara_alteration(filas)})
+            )['mascara'].to_numpy(dtype=np.uint16)
+        alteration_filtrado.loc[:, 'validación'] = validacion_alteration(alteration_filtrado, mascara)
+        if con_mascara:
+            alteration_filtrado['validación_bits'] = mascara
+
+        # 🔹 Retornar SOLO el DataFrame filtrado
+        return alteration_filtrado  
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante la validación en ALTERATION: {e}") from e
+
+# Mapeo entre Unit (Geology) y Rock_Type_Code (Major)
+correspondencias = {
+    "D": "ANDS", "VAND": "ANDS", "D1": "DIOR", "VL": "DACT", "VM": "DACT", "VD": "DACT",
+    "SPP": "MASS", "SOP": "MASS", "SPB": "MASS", "SOB": "MASS", "SSL": "MASS", "SSM": "SMSS",
+    "BXMM": "FSTF", "I": "GRDR", "P": "PEGM", "BXC": "BRTC", "VRD": "RIDC", "CO": "SOLO",
+    "Q": "VTQZ", "LOST": "XXXX", "F": "PNZO", "LOST": "YYYY"
+}
+
+# `correspondencias` compilado a arreglos: UNIT -> posición -> ROCK_TYPE_CODE esperado
+# (el último elemento, "", corresponde a las UNIT sin correspondencia)
+_UNITS_MAJOR = list(correspondencias)
+_ROCK_TYPES_MAJOR = np.array(list(correspondencias.values()) + [""], dtype=object)
+
+
+def rock_type_esperado(units):
+    return _ROCK_TYPES_MAJOR[codigos_en_tabla(units, _UNITS_MAJOR)]
+
+
+def codigos_pozo(*series):
+    # Código entero común de hole_number para varias tablas (-1 si está vacío)
+    codigos, _ = pd.factorize(pd.concat([s.astype(object) for s in series], ignore_index=True))
+    limites = np.cumsum([len(s) for s in series])[:-1]
+    return np.split(codigos, limites)
+
+
+def escala_profundidad(*profundidades):
+    # Origen y paso para combinar pozo y profundidad en una sola clave ordenable:
+    # clave = codigo_pozo * paso + (profundidad - origen). Cada pozo ocupa un tramo
+    # disjunto de claves, separado del siguiente por al menos una unidad.
+    finitas = [p[np.isfinite(p)] for p in profundidades]
+    finitas = [p for p in finitas if len(p)]
+    if not finitas:
+        return 0.0, 1.0
+    origen = min(p.min() for p in finitas)
+    return origen, max(p.max() for p in finitas) - origen + 1.0
+
+
+def contencion_major_geology(geology, major):
+    # Asigna los segmentos de Geology a los intervalos de Major que los contienen
+    # (depth_from >= from_major y depth_to <= to_major, en el mismo pozo) con un
+    # ordenamiento y dos búsquedas binarias, en lugar de una máscara por fila de Major.
+    # Geology con depth_to < depth_from más allá del intervalo no se considera.
+    cod_geology, cod_major = codigos_pozo(geology['hole_number'], major['hole_number'])
+    g_from = profundidades(geology['depth_from'])
+    g_to = profundidades(geology['depth_to'])
+    m_from = profundidades(major['depth_from'])
+    m_to = profundidades(major['depth_to'])
+    origen, paso = escala_profundidad(g_from, g_to, m_from, m_to)
+
+    # Geology ordenado por (pozo, depth_from)
+    g_validos = np.flatnonzero((cod_geology >= 0) & ~np.isnan(g_from) & ~np.isnan(g_to))
+    g_clave = cod_geology[g_validos] * paso + (g_from[g_validos] - origen)
+    orden = np.argsort(g_clave, kind="stable")
+    g_validos, g_clave = g_validos[orden], g_clave[orden]
+
+    # Rango de candidatos de cada Major: depth_from de Geology dentro de [from_major, to_major]
+    m_validos = (cod_major >= 0) & ~np.isnan(m_from) & ~np.isnan(m_to)
+    inicio = np.searchsorted(g_clave, cod_major * paso + (m_from - origen), side="left")
+    fin = np.searchsorted(g_clave, cod_major * paso + (m_to - origen), side="right")
+    cuantos = np.where(m_validos, np.maximum(fin - inicio, 0), 0)
+
+    # Expandir los pares (Major, Geology) candidatos y quedarse con los contenidos
+    n_major = len(major)
+    par_major = np.repeat(np.arange(n_major), cuantos)
+    desplazamiento = np.arange(len(par_major)) - np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+    par_geology = g_validos[np.repeat(inicio, cuantos) + desplazamiento]
+    contenido = g_to[par_geology] <= m_to[par_major]
+    par_major, par_geology = par_major[contenido], par_geology[contenido]
+
+    rock_type = major['rock_type_code'].to_numpy(dtype=object)
+    coincide = rock_type_esperado(geology['unit'])[par_geology] == rock_type[par_major]
+    segmentos = np.bincount(par_major, minlength=n_major)
+    no_coinciden = np.bincount(par_major[~coincide], minlength=n_major)
+
+    validacion = np.where(
+        segmentos == 0, "Incorrecto (No contiene segmentos de Geology)",
+        np.where(no_coinciden == 0, "Correcto", "Incorrecto (Rock_Type no coincide con Units de Geology)")
+    )
+
+    # Units de Geology que no corresponden al ROCK_TYPE_CODE de cada Major
+    units_incorrectas = (
+        pd.DataFrame({
+            'major': par_major[~coincide],
+            'unit': geology['unit'].to_numpy(dtype=object)[par_geology[~coincide]].astype(str),
+        })
+        .drop_duplicates()
+        .groupby('major')['unit'].agg(", ".join)
+        .reindex(np.arange(n_major), fill_value="")
+    )
+
+    return pd.DataFrame({
+        'hole_number': major['hole_number'].to_numpy(),
+        'depth_from_major': m_from,
+        'depth_to_major': m_to,
+        'rock_type_major': rock_type,
+        'validación': validacion,
+        'units_incorrectas': units_incorrectas.to_numpy(),
+    })
+
+
+# Tolerancia (m) al comparar profundidades con las de Sample
+TOLERANCIA_PROFUNDIDAD = 0.01
+
+
+def profundidad_mas_cercana(ref_pozos, ref_profundidad, pozos, profundidad):
+    # Para cada profundidad, la profundidad de referencia más cercana del mismo
+    # pozo (NaN si el pozo no tiene referencias), vía búsqueda binaria
+    cercana = np.full(len(profundidad), np.nan)
+    validos = (ref_pozos >= 0) & ~np.isnan(ref_profundidad)
+    if not validos.any():
+        return cercana
+
+    origen, paso = escala_profundidad(ref_profundidad, profundidad)
+    ref_clave = ref_pozos[validos] * paso + (ref_profundidad[validos] - origen)
+    orden = np.argsort(ref_clave, kind="stable")
+    ref_clave = ref_clave[orden]
+    ref_pozos = ref_pozos[validos][orden]
+    ref_profundidad = ref_profundidad[validos][orden]
+
+    posicion = np.searchsorted(ref_clave, pozos * paso + (profundidad - origen))
+    izquierda = np.clip(posicion - 1, 0, len(ref_clave) - 1)
+    derecha = np.clip(posicion, 0, len(ref_clave) - 1)
+    with np.errstate(invalid="ignore"):
+        dist_izquierda = np.where(ref_pozos[izquierda] == pozos, np.abs(profundidad - ref_profundidad[izquierda]), np.inf)
+        dist_derecha = np.where(ref_pozos[derecha] == pozos, np.abs(profundidad - ref_profundidad[derecha]), np.inf)
+        elegido = np.where(dist_derecha < dist_izquierda, derecha, izquierda)
+        encontrado = np.isfinite(np.minimum(dist_izquierda, dist_derecha))
+    cercana[encontrado] = ref_profundidad[elegido[encontrado]]
+    return cercana
+
+
+def comparar_intervalos(sample, tabla, tipo, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    # Contrasta depth_from/depth_to de la tabla con los de Sample del mismo pozo,
+    # informando la profundidad de Sample más cercana y el desfase de cada una
+    cod_sample, cod_tabla = codigos_pozo(sample['hole_number'], tabla['hole_number'])
+    depth_from = profundidades(tabla['depth_from'])
+    depth_to = profundidades(tabla['depth_to'])
+
+    cercano_from = profundidad_mas_cercana(cod_sample, profundidades(sample['depth_from']), cod_tabla, depth_from)
+    cercano_to = profundidad_mas_cercana(cod_sample, profundidades(sample['depth_to']), cod_tabla, depth_to)
+    desfase_from = depth_from - cercano_from
+    desfase_to = depth_to - cercano_to
+
+    # Margen para errores de redondeo al restar profundidades
+    limite = tolerancia + 1e-9
+    with np.errstate(invalid="ignore"):
+        correcto = (np.abs(desfase_from) <= limite) & (np.abs(desfase_to) <= limite)
+
+    return pd.DataFrame({
+        'hole_number': tabla['hole_number'].to_numpy(),
+        'depth_from': depth_from,
+        'depth_to': depth_to,
+        'archivo': tipo,
+        'validación': np.where(correcto, "Correcto", "Incorrecto"),
+        'sample_depth_from': cercano_from,
+        'desfase_from': desfase_from,
+        'sample_depth_to': cercano_to,
+        'desfase_to': desfase_to,
+    })
+
+
+# Función para validar intervalos
+# Columnas de comparar_intervalos que dependen de Sample (las demás son de la propia tabla)
+COLUMNAS_VEREDICTO_INTERVALOS = ['validación', 'sample_depth_from', 'desfase_from', 'sample_depth_to', 'desfase_to']
+
+
+@medir()
+def validar_intervalos(sample_df, validation_df, tipo, hole_number, tolerancia=TOLERANCIA_PROFUNDIDAD, almacen=None):
+    try:
+        sample_df.columns = sample_df.columns.str.strip().str.lower()
+        validation_df.columns = validation_df.columns.str.strip().str.lower()
+
+        sample_filtered = filtrar_pozo(sample_df, hole_number)
+        validation_filtered = filtrar_pozo(validation_df, hole_number)
+
+        if sample_filtered.empty:
+            raise ErrorValidacion(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Sample.")
+        if validation_filtered.empty:
+            raise ErrorValidacion(f"No se encontraron datos para HOLE_NUMBER {hole_number} en {tipo}.")
+
+        if almacen is None:
+            return comparar_intervalos(sample_filtered, validation_filtered, tipo, tolerancia)
+
+        # Un tramo se vuelve a comparar si cambió él o cambiaron los tramos de Sample del pozo
+        contexto = (huella_tabla(sample_filtered, ['depth_from', 'depth_to']), tolerancia)
+        veredictos = almacen.veredictos(
+            f"intervalos {tipo}", validation_filtered, [],
+            lambda filas: comparar_intervalos(sample_filtered, filas, tipo, tolerancia)[COLUMNAS_VEREDICTO_INTERVALOS],
+            contexto,
+        )
+        return pd.DataFrame({
+            'hole_number': validation_filtered['hole_number'].to_numpy(),
+            'depth_from': profundidades(validation_filtered['depth_from']),
+            'depth_to': profundidades(validation_filtered['depth_to']),
+            'archivo': tipo,
+            **{columna: veredictos[columna].to_numpy() for columna in COLUMNAS_VEREDICTO_INTERVALOS},
+        })
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante la validación de intervalos en {tipo}: {e}") from e
+
+# Función para validar Major vs Geology
+@medir()
+def validar_major_geology(geology_df, major_df, hole_number, almacen=None):
+    try:
+        geology_df.columns = geology_df.columns.str.strip().str.lower()
+        major_df.columns = major_df.columns.str.strip().str.lower()
+
+        geology_filtered = filtrar_pozo(geology_df, hole_number)
+        major_filtered = filtrar_pozo(major_df, hole_number)
+
+        if geology_filtered.empty:
+            raise ErrorValidacion(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Geology.")
+        if major_filtered.empty:
+            raise ErrorValidacion(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Major.")
+
+        if almacen is None:
+            return contencion_major_geology(geology_filtered, major_filtered)
+
+        # Un intervalo de Major se vuelve a validar si cambió él o cambió Geology en el pozo
+        contexto = (huella_tabla(geology_filtered, ['depth_from', 'depth_to', 'unit']),)
+        veredictos = almacen.veredictos(
+            "major", major_filtered, ['rock_type_code'],
+            lambda filas: contencion_major_geology(geology_filtered, filas)[['validación', 'units_incorrectas']],
+            contexto,
+        )
+        return pd.DataFrame({
+            'hole_number': major_filtered['hole_number'].to_numpy(),
+            'depth_from_major': profundidades(major_filtered['depth_from']),
+            'depth_to_major': profundidades(major_filtered['depth_to']),
+            'rock_type_major': major_filtered['rock_type_code'].to_numpy(dtype=object),
+            'validación': veredictos['validación'].to_numpy(),
+            'units_incorrectas': veredictos['units_incorrectas'].to_numpy(),
+        })
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante la validación entre Geology y Major: {e}") from e
+
+# Tablas de intervalos cuya continuidad se revisa; Sample es la referencia de cobertura
+TABLAS_INTERVALOS = ["Sample", "Geology", "Major", "Alteration", "Mine"]
+
+COLUMNAS_CONTINUIDAD = ['hole_number', 'tabla', 'problema', 'depth_from', 'depth_to', 'fila']
+
+
+def _ultimo_maximo(valores):
+    # Para cada posición, la posición del máximo acumulado de `valores` hasta ella
+    maximo = np.maximum.accumulate(valores)
+    return np.maximum.accumulate(np.where(valores == maximo, np.arange(len(valores)), 0))
+
+
+def _ordenar_tramos(codigos, desde, hasta):
+    # Tramos válidos ordenados por (pozo, depth_from, depth_to)
+    validos = np.flatnonzero((codigos >= 0) & ~np.isnan(desde) & ~np.isnan(hasta))
+    return validos[np.lexsort((hasta[validos], desde[validos], codigos[validos]))]
+
+
+def problemas_tabla(codigos, desde, hasta, origen, paso, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    # Huecos, superposiciones, tramos fuera de orden e invertidos de una tabla,
+    # con un ordenamiento y un recorrido. Devuelve (fila, problema, desde, hasta).
+    validos = np.flatnonzero((codigos >= 0) & ~np.isnan(desde) & ~np.isnan(hasta))
+
+    # Fuera de orden: depth_from menor que el de la fila anterior del mismo pozo,
+    # en el orden del archivo (argsort estable por pozo)
+    por_pozo = validos[np.argsort(codigos[validos], kind="stable")]
+    retrocede = (codigos[por_pozo][1:] == codigos[por_pozo][:-1]) & (desde[por_pozo][1:] < desde[por_pozo][:-1])
+    fuera_de_orden = por_pozo[1:][retrocede]
+    invertidos = validos[hasta[validos] < desde[validos]]
+
+    # Recorrido en orden de profundidad: cada tramo se compara con el mayor
+    # depth_to visto hasta el tramo anterior del mismo pozo (no solo con el anterior,
+    # para no perder superposiciones con un tramo largo que contiene a varios)
+    orden = _ordenar_tramos(codigos, desde, hasta)
+    cod, d = codigos[orden], desde[orden]
+    h = np.maximum(hasta[orden], d)  # un tramo invertido no extiende la cobertura
+    previo = h[_ultimo_maximo(cod * paso + (h - origen))][:-1]
+    mismo_pozo = cod[1:] == cod[:-1]
+    hueco = mismo_pozo & (d[1:] > previo + tolerancia)
+    # Un tramo invertido o de largo cero no cubre nada: ya se informa como
+    # invertido y no se superpone con el tramo que lo contiene
+    fin_superposicion = np.minimum(previo, h[1:])
+    superposicion = mismo_pozo & (d[1:] < previo - tolerancia) & (fin_superposicion > d[1:])
+
+    return [
+        (orden[1:][hueco], "Hueco", previo[hueco], d[1:][hueco]),
+        (orden[1:][superposicion], "Superposición", d[1:][superposicion], fin_superposicion[superposicion]),
+        (fuera_de_orden, "Fuera de orden", desde[fuera_de_orden], hasta[fuera_de_orden]),
+        (invertidos, "Invertido (depth_to < depth_from)", desde[invertidos], hasta[invertidos]),
+    ]
+
+
+def cobertura(codigos, desde, hasta, origen, paso, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    # Unión de los tramos de cada pozo: (pozo, desde, hasta) de cada bloque continuo
+    orden = _ordenar_tramos(codigos, desde, hasta)
+    orden = orden[hasta[orden] > desde[orden]]
+    cod, d, h = codigos[orden], desde[orden], hasta[orden]
+    if not len(cod):
+        return cod, d, h
+    hasta_max = h[_ultimo_maximo(cod * paso + (h - origen))]
+    inicio = np.ones(len(cod), dtype=bool)
+    inicio[1:] = (cod[1:] != cod[:-1]) | (d[1:] > hasta_max[:-1] + tolerancia)
+    inicios = np.flatnonzero(inicio)
+    fines = np.append(inicios[1:], len(cod)) - 1
+    return cod[inicios], d[inicios], hasta_max[fines]
+
+
+def sin_cobertura(a, b, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    # Tramos cubiertos por la cobertura `a` y no por `b` (ambas de cobertura()),
+    # recorriendo los bordes de ambas en orden de (pozo, profundidad)
+    cod = np.concatenate([a[0], a[0], b[0], b[0]])
+    profundidad = np.concatenate([a[1], a[2], b[1], b[2]])
+    n_a, n_b = len(a[0]), len(b[0])
+    delta_a = np.concatenate([np.ones(n_a), -np.ones(n_a), np.zeros(2 * n_b)])
+    delta_b = np.concatenate([np.zeros(2 * n_a), np.ones(n_b), -np.ones(n_b)])
+    orden = np.lexsort((profundidad, cod))
+    cod, profundidad = cod[orden], profundidad[orden]
+    # Cada pozo abre y cierra sus bloques: los acumulados vuelven a cero entre pozos
+    en_a, en_b = np.cumsum(delta_a[orden])[:-1], np.cumsum(delta_b[orden])[:-1]
+    faltante = (
+        (cod[1:] == cod[:-1]) & (en_a > 0) & (en_b <= 0)
+        & (profundidad[1:] - profundidad[:-1] > tolerancia)
+    )
+    return cod[:-1][faltante], profundidad[:-1][faltante], profundidad[1:][faltante]
+
+
+def continuidad_intervalos(tablas, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    # Huecos, superposiciones y tramos fuera de orden de cada tabla, y tramos
+    # cubiertos por Sample y no por otra tabla (o al revés), para todos los pozos.
+    # `tablas` es {nombre en TABLAS_INTERVALOS: DataFrame o None}.
+    tablas = {nombre: df for nombre, df in tablas.items() if df is not None}
+    if not tablas:
+        return pd.DataFrame(columns=COLUMNAS_CONTINUIDAD)
+
+    codigos, pozos = pd.factorize(pd.concat([df['hole_number'].astype(object) for df in tablas.values()], ignore_index=True))
+    codigos = dict(zip(tablas, np.split(codigos, np.cumsum([len(df) for df in tablas.values()])[:-1])))
+    desde = {nombre: profundidades(df['depth_from']) for nombre, df in tablas.items()}
+    hasta = {nombre: profundidades(df['depth_to']) for nombre, df in tablas.items()}
+    origen, paso = escala_profundidad(*desde.values(), *hasta.values())
+
+    partes = []
+    coberturas = {}
+    for nombre, df in tablas.items():
+        for filas, problema, d, h in problemas_tabla(codigos[nombre], desde[nombre], hasta[nombre], origen, paso, tolerancia):
+            partes.append(pd.DataFrame({
+                'codigo': codigos[nombre][filas], 'tabla': nombre, 'problema': problema,
+                'depth_from': d, 'depth_to': h, 'fila': pd.array(df.index[filas], dtype="Int64"),
+            }))
+        coberturas[nombre] = cobertura(codigos[nombre], desde[nombre], hasta[nombre], origen, paso, tolerancia)
+
+    if "Sample" in coberturas:
+        for nombre in coberturas:
+            if nombre == "Sample":
+                continue
+            for a, b, tabla, problema in [
+                ("Sample", nombre, nombre, "Sin cobertura (cubierto en Sample)"),
+                (nombre, "Sample", "Sample", f"Sin cobertura (cubierto en {nombre})"),
+            ]:
+                cod, d, h = sin_cobertura(coberturas[a], coberturas[b], tolerancia)
+                partes.append(pd.DataFrame({
+                    'codigo': cod, 'tabla': tabla, 'problema': problema,
+                    'depth_from': d, 'depth_to': h, 'fila': pd.array([pd.NA] * len(cod), dtype="Int64"),
+                }))
+
+    resultado = pd.concat(partes, ignore_index=True)
+    resultado['hole_number'] = np.asarray(pozos, dtype=object)[resultado['codigo'].to_numpy(dtype=np.int64)]
+    resultado = resultado.sort_values(['codigo', 'depth_from', 'tabla'], kind="stable")
+    return resultado[COLUMNAS_CONTINUIDAD].reset_index(drop=True)
+
+
+@medir()
+def validar_continuidad(tablas, hole_number, tolerancia=TOLERANCIA_PROFUNDIDAD):
+    try:
+        filtradas = {
+            nombre: filtrar_pozo(df, hole_number) for nombre, df in tablas.items() if df is not None
+        }
+        filtradas = {nombre: df for nombre, df in filtradas.items() if not df.empty}
+        if not filtradas:
+            raise AvisoValidacion(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
+        return continuidad_intervalos(filtradas, tolerancia)
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante la validación de continuidad de intervalos: {e}") from e
+
+
+def contar_por_pozo(pozos, mascara):
+    # Cantidad de filas marcadas por pozo (incluye los pozos con cero)
+    return pd.Series(np.asarray(mascara)).groupby(pozos.to_numpy(dtype=object)).sum()
+
+
+# Lista de estándares a analizar
+estandares_relevantes = ["PECLSTD006", "DP", "RG", "PECLSTD007", "PECLBLK002"]
+
+# Porcentaje mínimo de standards y DP/RG (sobre el total de muestras) esperado en cada pozo
+UMBRAL_PORCENTAJE_STANDARDS = 5.0
+
+
+def desglose_estandares(sample, standards):
+    # Cantidad de cada código de estandares_relevantes por pozo, en una sola
+    # tabla cruzada: los standards según assay_standard_code y los DP/RG según
+    # assay_sample_type_code
+    pozos, codigos = [], []
+    for df, columna in [(standards, "assay_standard_code"), (sample, "assay_sample_type_code")]:
+        relevantes = df[columna].isin(estandares_relevantes).to_numpy()
+        pozos.append(df["hole_number"][relevantes].to_numpy(dtype=object))
+        codigos.append(df[columna][relevantes].to_numpy(dtype=object))
+    desglose = pd.crosstab(np.concatenate(pozos), np.concatenate(codigos))
+    return desglose.reindex(columns=estandares_relevantes, fill_value=0).rename_axis(index=None, columns=None)
+
+
+def porcentaje_standards_por_pozo(sample, standards):
+    # Muestras OR, DP/RG (que cuentan como estándares) y standards de todos los
+    # pozos, contados en una sola agrupación
+    es_dp_rg = sample["assay_sample_type_code"].isin(["DP", "RG"])
+    conteos = pd.DataFrame({
+        "Total Muestras OR": contar_por_pozo(sample["hole_number"], ~es_dp_rg),
+        "Total Standards Relevantes": pd.Series(standards["hole_number"].to_numpy(dtype=object)).value_counts(),
+        "Total DP/RG (como estándares)": contar_por_pozo(sample["hole_number"], es_dp_rg),
+    })
+    conteos = conteos.join(desglose_estandares(sample, standards)).fillna(0).astype(int)
+
+    estandares = conteos["Total Standards Relevantes"] + conteos["Total DP/RG (como estándares)"]
+    total = estandares + conteos["Total Muestras OR"]
+    conteos["Porcentaje Standards (%)"] = (estandares / total.where(total > 0)).fillna(0) * 100
+
+    conteos = conteos[total > 0]
+    conteos.index.name = "HOLE_NUMBER"
+    return conteos.reset_index()
+
+
+# Validación de todos los pozos de la campaña en una sola pasada: cada validador
+# se ejecuta una vez sobre la tabla completa y los resultados se agrupan por pozo
+@medir()
+def validar_campana(geology_df=None, sample_df=None, standards_df=None, alteration_df=None,
+                    mine_df=None, major_df=None, tolerancia=TOLERANCIA_PROFUNDIDAD, umbral_standards=None):
+    try:
+        detalles = {}
+        conteos = {}
+
+        if geology_df is not None:
+            detalles["Geology"] = geology_df.assign(**{"validación_geo": validacion_geo(geology_df)})
+            conteos["geology_incorrectos"] = contar_por_pozo(
+                geology_df["hole_number"], detalles["Geology"]["validación_geo"] == "incorrecto"
+            )
+
+        if alteration_df is not None:
+            mascara = mascara_alteration(alteration_df)
+            detalles["Alteration"] = alteration_df.assign(**{
+                "validación": validacion_alteration(alteration_df, mascara),
+                "validación_bits": mascara,
+            })
+            conteos["alteration_incorrectos"] = contar_por_pozo(alteration_df["hole_number"], mascara != 0)
+
+        if sample_df is not None and standards_df is not None:
+            detalles["Sample & Standards"] = tabla_sample_standards(sample_df, standards_df)
+            conteos["tramos_observados"] = contar_por_pozo(
+                detalles["Sample & Standards"]["hole_number"],
+                detalles["Sample & Standards"]["tramo_valido"] == "⚠️ Observado"
+            )
+
+        if sample_df is not None:
+            tablas = {"Geology": geology_df, "Major": major_df, "Alteration": alteration_df, "Mine": mine_df}
+            intervalos = [
+                comparar_intervalos(sample_df, tabla, tipo, tolerancia)
+                for tipo, tabla in tablas.items() if tabla is not None
+            ]
+            if intervalos:
+                detalles["Intervals"] = pd.concat(intervalos, ignore_index=True)
+                conteos["intervalos_incorrectos"] = contar_por_pozo(
+                    detalles["Intervals"]["hole_number"], detalles["Intervals"]["validación"] != "Correcto"
+                )
+
+        if geology_df is not None and major_df is not None:
+            detalles["Major"] = contencion_major_geology(geology_df, major_df)
+            conteos["major_incorrectos"] = contar_por_pozo(
+                detalles["Major"]["hole_number"], detalles["Major"]["validación"] != "Correcto"
+            )
+
+        tablas_intervalos = dict(zip(TABLAS_INTERVALOS, [sample_df, geology_df, major_df, alteration_df, mine_df]))
+        if any(df is not None for df in tablas_intervalos.values()):
+            detalles["Continuidad"] = continuidad_intervalos(tablas_intervalos, tolerancia)
+            conteos["continuidad_observaciones"] = contar_por_pozo(
+                detalles["Continuidad"]["hole_number"], np.ones(len(detalles["Continuidad"]), dtype=bool)
+            )
+
+        if not conteos:
+            raise AvisoValidacion("No hay archivos cargados para validar la campaña.")
+
+        resumen = pd.DataFrame(conteos).fillna(0).astype(int)
+        observaciones = resumen.sum(axis=1)
+
+        if sample_df is not None and standards_df is not None:
+            porcentajes = porcentaje_standards_por_pozo(sample_df, standards_df)
+            detalles["Standards"] = porcentajes
+            resumen["porcentaje_standards"] = porcentajes.set_index("HOLE_NUMBER")["Porcentaje Standards (%)"]
+            if umbral_standards is not None:
+                # Con umbral, un pozo con menos standards de los esperados queda observado
+                bajo_umbral = (resumen["porcentaje_standards"] < umbral_standards).astype(int)
+                resumen["standards_bajo_umbral"] = bajo_umbral
+                observaciones = observaciones + bajo_umbral
+
+        resumen["estado"] = np.where(observaciones == 0, "Aprobado", "Observado")
+        resumen.index.name = "hole_number"
+        return resumen.reset_index(), detalles
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante la validación de la campaña: {e}") from e
+
+# Función para calcular el porcentaje de estándares respecto a las muestras OR
+@medir()
+def calcular_porcentaje_standards(sample_df, standards_df, hole_number):
+    if sample_df is None or standards_df is None:
+        raise AvisoValidacion("Error: No se han cargado ambos archivos correctamente.")
+
+    # Filtrar por HOLE_NUMBER
+    sample_filtrado = filtrar_pozo(sample_df, hole_number)
+    standards_filtrado = filtrar_pozo(standards_df, hole_number)
+
+    resumen_df = porcentaje_standards_por_pozo(sample_filtrado, standards_filtrado)
+
+    if resumen_df.empty:
+        raise AvisoValidacion(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
+
+    resumen_df["HOLE_NUMBER"] = hole_number
+    porcentaje_standards = resumen_df["Porcentaje Standards (%)"].iloc[0] / 100
+
+    return resumen_df, porcentaje_standards
+
+
+# Porcentaje de standards de todos los pozos en una sola agrupación, con el
+# desglose por código de estandares_relevantes y los pozos bajo `umbral` (%) marcados
+@medir()
+def porcentaje_standards_campana(sample_df, standards_df, umbral=UMBRAL_PORCENTAJE_STANDARDS):
+    if sample_df is None or standards_df is None:
+        raise AvisoValidacion("Error: No se han cargado ambos archivos correctamente.")
+    try:
+        resumen_df = porcentaje_standards_por_pozo(sample_df, standards_df)
+        if resumen_df.empty:
+            raise AvisoValidacion("No se encontraron muestras ni standards en los archivos cargados.")
+        resumen_df["validación"] = np.where(
+            resumen_df["Porcentaje Standards (%)"] < umbral, f"Bajo el umbral ({umbral:g} %)", "Correcto"
+        )
+        return resumen_df
+    except ErrorValidacion:
+        raise
+    except Exception as e:
+        raise ErrorValidacion(f"Error durante el cálculo del porcentaje de standards: {e}") from e
+
+
+
+
+# Tablas del Fusion, en el orden de los parámetros de validar_campana
+TABLAS = ["geology", "sample", "standards", "alteration", "mine", "major"]
+
+
+@medir()
+def validar_campana_paralela(tablas, pozos=None, procesos=None, tolerancia=TOLERANCIA_PROFUNDIDAD,
+                             umbral_standards=None):
+    # Reparte los pozos entre `procesos` procesos (en turnos, para equilibrar la
+    # carga), valida cada lote con validar_campana y une los resultados.
+    # `tablas` es un diccionario {nombre en TABLAS: DataFrame o None}. Los pozos
+    # pedidos que no tienen filas en ninguna tabla quedan en el resumen con el
+    # estado "Sin datos".
+    cargadas = [tabla for tabla in tablas.values() if tabla is not None]
+    if not cargadas:
+        raise AvisoValidacion("No hay archivos cargados para validar la campaña.")
+
+    todos = pozos is None
+    faltantes = []
+    if todos:
+        pozos = pd.unique(pd.concat([tabla["hole_number"].astype(object) for tabla in cargadas]).dropna())
+    else:
+        indices = [indice_pozo(tabla) for tabla in cargadas]
+        faltantes = [pozo for pozo in pozos if not any(pozo in indice for indice in indices)]
+        pozos = [pozo for pozo in pozos if pozo not in faltantes]
+        if not pozos:
+            raise AvisoValidacion(f"No se encontraron datos para HOLE_NUMBER: {', '.join(map(str, faltantes))}")
+    pozos = list(pozos)
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(pozos)))
+
+    def subtablas(lote):
+        return {
+            f"{nombre}_df": None if tablas.get(nombre) is None else filtrar_pozos(tablas[nombre], lote)
+            for nombre in TABLAS
+        }
+
+    if procesos == 1:
+        if todos:
+            return validar_campana(
+                **{f"{nombre}_df": tablas.get(nombre) for nombre in TABLAS},
+                tolerancia=tolerancia, umbral_standards=umbral_standards
+            )
+        resumen, detalles = validar_campana(
+            **subtablas(pozos), tolerancia=tolerancia, umbral_standards=umbral_standards
+        )
+        return _agregar_sin_datos(resumen, faltantes), detalles
+
+    lotes = [pozos[i::procesos] for i in range(procesos)]
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        futuros = [
+            ejecutor.submit(validar_campana, **subtablas(lote), tolerancia=tolerancia, umbral_standards=umbral_standards)
+            for lote in lotes
+        ]
+        resultados = [futuro.result() for futuro in futuros]
+
+    resumen = pd.concat([resumen for resumen, _ in resultados], ignore_index=True)
+    detalles = {}
+    for _, detalles_lote in resultados:
+        for nombre, detalle in detalles_lote.items():
+            detalles.setdefault(nombre, []).append(detalle)
+    return (
+        _agregar_sin_datos(resumen, faltantes),
+        {nombre: pd.concat(partes, ignore_index=True) for nombre, partes in detalles.items()},
+    )
+
+
+def _agregar_sin_datos(resumen, faltantes):
+    # Filas del resumen para los pozos pedidos sin datos; los conteos quedan vacíos
+    if not faltantes:
+        return resumen
+    enteras = resumen.columns[resumen.dtypes == np.int64]
+    resumen = pd.concat(
+        [resumen, pd.DataFrame({"hole_number": faltantes, "estado": "Sin datos"})], ignore_index=True
+    )
+    return resumen.astype({columna: "Int64" for columna in enteras})
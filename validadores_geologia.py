@@ -3,244 +3,138 @@ import pandas as pd
 import csv
 import chardet
 import os
-import io
+import hashlib
 import openpyxl
-from openpyxl.styles import PatternFill, Font
 import plotly.express as px
+import tracemalloc
 
+import exportacion
+import instrumentacion
+import motor_validacion as motor
+from almacen_veredictos import AlmacenVeredictos
+from cache_tablas import CacheTablas
 
-def leer_csv(archivo):
-    try:
-        if archivo is None:
-            st.error("Error: No se ha subido ningún archivo.")
-            return None
-
-        # Intentar primero con utf-8
-        try:
-            archivo.seek(0)
-            df = pd.read_csv(archivo, encoding="utf-8", on_bad_lines="skip")
-        except UnicodeDecodeError:
-            archivo.seek(0)
-            df = pd.read_csv(archivo, encoding="utf-16", on_bad_lines="skip")
-
-        if df.empty:
-            st.error(f"Error: El archivo {archivo.name} está vacío.")
-            return None
-
-        return df
-    except Exception as e:
-        st.error(f"Error al leer el archivo {archivo.name}: {e}")
-        return None
-
-def validar_geo(df, hole_number):
-    if df is None:
-        st.error("⚠️ Error: No se pudo cargar el archivo Geology correctamente.")
-        return None  # Detener la función si el DataFrame está vacío
-
-    df.columns = df.columns.str.strip().str.lower()  # Normalizar nombres de columnas
-    
-    # Filtrar por HOLE_NUMBER
-    df_filtrado = df[df["hole_number"] == hole_number]
-
-    if df_filtrado.empty:
-        st.warning(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
-        return None
-
-    condiciones = {
-        31: ["VD"], 3: ["D", "D1"], 37: ["VAND"], 2: ["VL"], 28: ["VM"], 
-        6: ["SPP"], 7: ["SOP"], 9: ["SPB"], 10: ["SOB"], 25: ["SSL"], 
-        5: ["SSM"], 34: ["BXMM"], 30: ["I"], 14: ["P"], 8: ["BXC"], 
-        32: ["VRD"], 33: ["VRD"], 12: ["CO"], 13: ["Q"], 17: ["LOST"], 15: ["F"]
-    }
 
-    df_filtrado['validación_geo'] = df_filtrado.apply(
-        lambda row: 'correcto' if row['clito'] in condiciones and row['unit'] in condiciones[row['clito']] 
-        else 'incorrecto', axis=1
-    )
+# Caché de tablas leídas, compartida entre sesiones y reruns.
+# LOGUEO_CACHE_MB: memoria máxima; LOGUEO_CACHE_DIR: carpeta opcional donde se
+# vuelcan en Parquet las tablas desalojadas de memoria; LOGUEO_CACHE_DIR_MB:
+# tamaño máximo de esa carpeta (se borran primero los volcados menos usados).
+CACHE_MAX_MB = int(os.environ.get("LOGUEO_CACHE_MB", "2048"))
+CACHE_DIR = os.environ.get("LOGUEO_CACHE_DIR")
+CACHE_DIR_MAX_MB = int(os.environ.get("LOGUEO_CACHE_DIR_MB", "10240"))
+# LOGUEO_VEREDICTOS_MB: memoria máxima de los veredictos guardados entre validaciones
+# (aparte de LOGUEO_CACHE_MB).
+VEREDICTOS_MAX_MB = int(os.environ.get("LOGUEO_VEREDICTOS_MB", "512"))
 
-    return df_filtrado
+# Diagnóstico: LOGUEO_DIAGNOSTICO_LOG, archivo donde se agregan las mediciones por
+# etapa como líneas JSON; LOGUEO_TRAZAR_MEMORIA=1 mide el pico de memoria de cada
+# etapa con tracemalloc (hace más lenta la aplicación)
+DIAGNOSTICO_LOG = os.environ.get("LOGUEO_DIAGNOSTICO_LOG")
+TRAZAR_MEMORIA = os.environ.get("LOGUEO_TRAZAR_MEMORIA") == "1"
 
-# Función para validar Sample y Standards
 
-def validar_sample_standards(sample_df, standards_df, hole_number):
-    try:
-        sample_df.columns = sample_df.columns.str.strip().str.lower()
-        standards_df.columns = standards_df.columns.str.strip().str.lower()
-
-        # Filtrar por HOLE_NUMBER
-        sample_filtered = sample_df[sample_df['hole_number'] == hole_number].copy()
-        standards_filtered = standards_df[standards_df['hole_number'] == hole_number].copy()
-
-        # DataFrame para Sample
-        df_sample = sample_filtered[['hole_number', 'sample_number', 'depth_from', 'depth_to', 'assay_sample_type_code','parent_sample_number']].copy()
-        df_sample['tipo_muestra'] = df_sample['assay_sample_type_code']
-        df_sample['depth_range'] = df_sample['depth_to'] - df_sample['depth_from']
-        df_sample['tramo_valido'] = df_sample['depth_range'].apply(lambda x: '✅ Correcto' if 0.5 <= x <= 1.5 else '⚠️ Observado')
-        df_sample = df_sample.drop(columns=['assay_sample_type_code'])
-
-        # DataFrame para Standards (sin validación de tramo)
-        df_standards = standards_filtered[['hole_number', 'sample_number', 'assay_standard_code']].copy()
-        df_standards['tipo_muestra'] = df_standards['assay_standard_code']
-        df_standards['depth_from'] = None
-        df_standards['depth_to'] = None
-        df_standards['depth_range'] = None
-        df_standards['tramo_valido'] = None
-        df_standards = df_standards.drop(columns=['assay_standard_code'])
-
-        # Unir ambos DataFrames
-        resultado = pd.concat([df_sample, df_standards], ignore_index=True)
-        resultado = resultado.drop_duplicates(subset=['hole_number', 'sample_number', 'tipo_muestra'])
-        resultado = resultado.sort_values(by='sample_number', ascending=True)
-
-        # Reordenar columnas para visualización
-        columnas_finales = [
-            'hole_number', 'sample_number', 'tipo_muestra', 'parent_sample_number',
-            'depth_from', 'depth_to', 'depth_range', 'tramo_valido'
-        ]
-        resultado = resultado[columnas_finales]
-
-        return resultado
-    except Exception as e:
-        st.error(f"Error en validar_sample_standards: {e}")
-        return None
-    
-# Función para validar Alteration
-def validar_alteration(alteration_df, hole_number):
-    try:
-        if alteration_df is None:
-            st.error("⚠️ Error: No se pudo cargar el archivo Alteration correctamente.")
-            return None
-
-        alteration_df.columns = alteration_df.columns.str.strip().str.lower()
-
-        required_columns = ['hole_number', 'intensity_1', 'intensity_2', 'intensity_3', 
-                            'distribution_1', 'distribution_2', 'distribution_3']
-        missing_columns = [col for col in required_columns if col not in alteration_df.columns]
-
-        if missing_columns:
-            st.error(f"El archivo ALTERATION tiene columnas faltantes: {missing_columns}")
-            return None
-
-        # 🔹 Filtrar el DataFrame por `hole_number` antes de validar, asegurando que sea una copia independiente
-        alteration_filtrado = alteration_df[alteration_df['hole_number'] == hole_number].copy()
-
-        if alteration_filtrado.empty:
-            st.warning(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
-            return None
-
-        def validar_filas(row):
-            resultados = []
-            for i in range(1, 4):
-                if row[f'intensity_{i}'] == 'FORT' and row[f'distribution_{i}'] != 'PERV':
-                    resultados.append(f"Incorrecto en intensity_{i} y distribution_{i} (esperado PERV)")
-                if row[f'intensity_{i}'] == 'MODE' and pd.notnull(row[f'distribution_{i}']):
-                    resultados.append(f"Incorrecto en intensity_{i} y distribution_{i} (esperado vacío)")
-                if row[f'intensity_{i}'] == 'FRCA' and row[f'distribution_{i}'] not in ['PUNT', 'VEIN']:
-                    resultados.append(f"Incorrecto en intensity_{i} y distribution_{i} (esperado PUNT o VEIN)")
-
-            return " | ".join(resultados) if resultados else "Correcto"
-
-        # 🔹 Aplicar la validación **solo a las filas filtradas**
-        alteration_filtrado.loc[:, 'validación'] = alteration_filtrado.apply(validar_filas, axis=1)
-
-        # 🔹 Retornar SOLO el DataFrame filtrado
-        return alteration_filtrado  
-    except Exception as e:
-        st.error(f"Error durante la validación en ALTERATION: {e}")
-        return None
-
-# Mapeo entre Unit (Geology) y Rock_Type_Code (Major)
-correspondencias = {
-    "D": "ANDS", "VAND": "ANDS", "D1": "DIOR", "VL": "DACT", "VM": "DACT", "VD": "DACT",
-    "SPP": "MASS", "SOP": "MASS", "SPB": "MASS", "SOB": "MASS", "SSL": "MASS", "SSM": "SMSS",
-    "BXMM": "FSTF", "I": "GRDR", "P": "PEGM", "BXC": "BRTC", "VRD": "RIDC", "CO": "SOLO",
-    "Q": "VTQZ", "LOST": "XXXX", "F": "PNZO", "LOST": "YYYY"
-}
-
-
-# Función para validar intervalos
-def validar_intervalos(sample_df, validation_df, tipo, hole_number):
-    try:
-        sample_df.columns = sample_df.columns.str.strip().str.lower()
-        validation_df.columns = validation_df.columns.str.strip().str.lower()
-
-        sample_filtered = sample_df[sample_df['hole_number'] == hole_number]
-        validation_filtered = validation_df[validation_df['hole_number'] == hole_number]
-
-        if sample_filtered.empty:
-            st.error(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Sample.")
-            return None
-        if validation_filtered.empty:
-            st.error(f"No se encontraron datos para HOLE_NUMBER {hole_number} en {tipo}.")
-            return None
-
-        sample_depth_from = sample_filtered['depth_from'].unique()
-        sample_depth_to = sample_filtered['depth_to'].unique()
-
-        resultados = []
-        for _, row in validation_filtered.iterrows():
-            depth_from_correcto = row['depth_from'] in sample_depth_from
-            depth_to_correcto = row['depth_to'] in sample_depth_to
-
-            validacion = "Correcto" if depth_from_correcto and depth_to_correcto else "Incorrecto"
-
-            resultados.append({
-                'hole_number': row['hole_number'],
-                'depth_from': row['depth_from'],
-                'depth_to': row['depth_to'],
-                'archivo': tipo,
-                'validación': validacion
-            })
-
-        return pd.DataFrame(resultados)
-    except Exception as e:
-        st.error(f"Error durante la validación de intervalos en {tipo}: {e}")
-        return None
-
-# Función para validar Major vs Geology
-def validar_major_geology(geology_df, major_df, hole_number):
+@st.cache_resource
+def configurar_diagnostico():
+    # Una sola vez por proceso (no en cada rerun)
+    if DIAGNOSTICO_LOG:
+        instrumentacion.configurar_log(DIAGNOSTICO_LOG)
+    if TRAZAR_MEMORIA and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return True
+
+
+@st.cache_resource
+def obtener_cache_tablas():
+    return CacheTablas(CACHE_MAX_MB * 1024 * 1024, CACHE_DIR, CACHE_DIR_MAX_MB * 1024 * 1024)
+
+
+@st.cache_resource
+def obtener_almacen_veredictos():
+    # Veredictos por tramo compartidos entre sesiones: cuando se vuelve a subir un
+    # pozo re-exportado, solo se validan los tramos nuevos o editados
+    return AlmacenVeredictos(VEREDICTOS_MAX_MB * 1024 * 1024)
+
+
+def huella_archivo(archivo):
+    # Hash del contenido subido; se memoriza por file_id para no recalcularlo en cada rerun
+    hashes = st.session_state.setdefault("_hash_archivos", {})
+    file_id = getattr(archivo, "file_id", None)
+    if file_id is not None and file_id in hashes:
+        return hashes[file_id]
+
+    with archivo.getbuffer() as contenido:
+        huella = hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+    if file_id is not None:
+        hashes[file_id] = huella
+    return huella
+
+
+def ejecutar(funcion, *args, **kwargs):
+    # Los validadores del motor lanzan excepciones; aquí se muestran en la interfaz
     try:
-        geology_df.columns = geology_df.columns.str.strip().str.lower()
-        major_df.columns = major_df.columns.str.strip().str.lower()
-
-        geology_filtered = geology_df[geology_df['hole_number'] == hole_number]
-        major_filtered = major_df[major_df['hole_number'] == hole_number]
-
-        if geology_filtered.empty:
-            st.error(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Geology.")
-            return None
-        if major_filtered.empty:
-            st.error(f"No se encontraron datos para HOLE_NUMBER {hole_number} en Major.")
-            return None
-
-        resultados = []
-        for _, major_row in major_filtered.iterrows():
-            major_from, major_to, rock_type = major_row['depth_from'], major_row['depth_to'], major_row['rock_type_code']
-
-            geology_segmentos = geology_filtered[
-                (geology_filtered['depth_from'] >= major_from) & (geology_filtered['depth_to'] <= major_to)
-            ]
-
-            if geology_segmentos.empty:
-                validacion = "Incorrecto (No contiene segmentos de Geology)"
-            else:
-                unidades_geology = geology_segmentos['unit'].unique()
-                validacion = "Correcto" if all(correspondencias.get(unit, "") == rock_type for unit in unidades_geology) else "Incorrecto (Rock_Type no coincide con Units de Geology)"
-
-            resultados.append({
-                'hole_number': hole_number,
-                'depth_from_major': major_from,
-                'depth_to_major': major_to,
-                'rock_type_major': rock_type,
-                'validación': validacion
-            })
-
-        return pd.DataFrame(resultados)
-    except Exception as e:
-        st.error(f"Error durante la validación entre Geology y Major: {e}")
-        return None
+        return funcion(*args, **kwargs)
+    except motor.AvisoValidacion as e:
+        st.warning(str(e))
+    except motor.ErrorValidacion as e:
+        st.error(str(e))
+    return None
+
+
+@instrumentacion.medir()
+def leer_tablas(archivos, pozos=None):
+    # Cada archivo subido se analiza una sola vez: la tabla queda en la caché
+    # bajo el hash de su contenido (y del conjunto de pozos, si se lee por pozo).
+    # Los archivos que no están en la caché se analizan a la vez, uno por hilo.
+    cache = obtener_cache_tablas()
+    if pozos is not None:
+        pozos = list(dict.fromkeys(pozos))
+
+    tablas, claves, pendientes = {}, {}, {}
+    for tabla, archivo in archivos.items():
+        if archivo is None:
+            tablas[tabla] = None
+            continue
+
+        clave = clave_archivo = f"{tabla}-{huella_archivo(archivo)}"
+        if pozos is not None:
+            clave = f"{clave_archivo}-{motor.clave_pozos(pozos)}"
+        claves[tabla] = clave
+
+        df = cache.obtener(clave)
+        if df is None and pozos is not None:
+            # Si la tabla completa ya está en memoria, filtrarla es más barato que releer el archivo
+            completa = cache.obtener(clave_archivo, solo_memoria=True)
+            if completa is not None:
+                df = motor.filtrar_pozos(completa, pozos).reset_index(drop=True)
+                cache.guardar(clave, df)
+        if df is None:
+            pendientes[tabla] = archivo
+        tablas[tabla] = df
+
+    # Los errores se muestran desde el hilo del script (Streamlit no dibuja desde otros hilos)
+    for tabla, futuro in motor.leer_en_paralelo(pendientes, pozos).items():
+        tablas[tabla] = ejecutar(futuro.result)
+        if tablas[tabla] is not None:
+            cache.guardar(claves[tabla], tablas[tabla])
+
+    for tabla, df in tablas.items():
+        if df is not None:
+            registrar_memoria(claves[tabla], archivos[tabla], df, tabla)
+    return tablas
+
+
+def registrar_memoria(clave, archivo, df, tabla):
+    # Memoria de cada tabla cargada (con y sin esquema); se recalcula solo si cambia la tabla
+    informes = st.session_state.setdefault("_memoria_tablas", {})
+    if tabla not in informes or informes[tabla][0] != clave:
+        informes[tabla] = (clave, ejecutar(motor.informe_memoria, archivo, df, tabla))
+
 
 # Interfaz en Streamlit
+configurar_diagnostico()
+etapas_diagnostico = instrumentacion.iniciar_recoleccion()
+
 st.title("Validación de Datos Geológicos")
 
 hole_number = st.text_input("Ingrese el HOLE_NUMBER a buscar:", key="hole_number_input")
@@ -253,206 +147,221 @@ alteration_file = st.file_uploader("Cargar Alteration (.csv)", type=["csv"], key
 mine_file = st.file_uploader("Cargar Mine (.csv)", type=["csv"], key="mine_uploader")
 major_file = st.file_uploader("Cargar Major (.csv)", type=["csv"], key="major_uploader")
 
+# Con archivos de campaña muy grandes se puede leer solo el HOLE_NUMBER ingresado
+lectura_por_pozo = st.checkbox(
+    "Leer solo el HOLE_NUMBER ingresado (archivos grandes)", key="lectura_por_pozo"
+)
+pozos = [hole_number] if lectura_por_pozo and hole_number else None
+
+formato_descarga = st.selectbox(
+    "Formato de descarga de resultados:", list(exportacion.FORMATOS), key="formato_descarga"
+)
+
 # Convertir archivos TXT a DataFrames
-geology_df = leer_csv(geology_file) if geology_file else None
-sample_df = leer_csv(sample_file) if sample_file else None
-standards_df = leer_csv(standards_file) if standards_file else None
-alteration_df = leer_csv(alteration_file) if alteration_file else None
-mine_df = leer_csv(mine_file) if mine_file else None
-major_df = leer_csv(major_file) if major_file else None
+tablas_cargadas = leer_tablas({
+    "geology": geology_file, "sample": sample_file, "standards": standards_file,
+    "alteration": alteration_file, "mine": mine_file, "major": major_file,
+}, pozos)
+geology_df = tablas_cargadas["geology"]
+sample_df = tablas_cargadas["sample"]
+standards_df = tablas_cargadas["standards"]
+alteration_df = tablas_cargadas["alteration"]
+mine_df = tablas_cargadas["mine"]
+major_df = tablas_cargadas["major"]
+
+# Memoria ocupada por las tablas cargadas, frente a leerlas sin esquema
+informes_memoria = [
+    informe for tabla, (_, informe) in st.session_state.get("_memoria_tablas", {}).items()
+    if tablas_cargadas[tabla] is not None and informe is not None
+]
+if informes_memoria:
+    with st.expander("Memoria de las tablas cargadas"):
+        st.dataframe(pd.DataFrame(informes_memoria).round(2))
 
 
 # Función para descargar archivos
 def descargar_resultados(df, nombre_archivo):
     if df is not None and not df.empty:
-        # Crear un buffer en memoria
-        output = io.BytesIO()
-        
-        # Guardar el DataFrame en el buffer como archivo Excel
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
-        
-        # Mover el cursor al inicio del archivo
-        output.seek(0)
-
-        # Botón de descarga
+        if ejecutar(exportacion.comprobar_exportable, df, formato_descarga) is None:
+            return
+        extension, mime, convertir = exportacion.FORMATOS[formato_descarga]
+        generado = {}
+
+        # El archivo se genera solo cuando se hace clic en el botón, y una sola vez por resultado.
+        # Se genera fuera de la ejecución del script: su medición solo queda en el log JSON.
+        def generar():
+            if "datos" not in generado:
+                with instrumentacion.etapa(f"descargar_resultados {nombre_archivo}{extension}", filas_entrada=len(df)):
+                    generado["datos"] = convertir(df)
+            return generado["datos"]
+
+        # Botón de descarga (on_click="ignore": descargar no vuelve a ejecutar el script)
         st.download_button(
-            label=f"Descargar {nombre_archivo}",
-            data=output,
-            file_name=nombre_archivo,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            label=f"Descargar {nombre_archivo}{extension}",
+            data=generar,
+            file_name=f"{nombre_archivo}{extension}",
+            mime=mime,
+            on_click="ignore"
         )
 
-def exportar_a_excel(df, filename):
-    try:
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Resultados', index=False)
-
-            workbook = writer.book
-            sheet = workbook['Resultados']
-
-            # Formato del encabezado
-            encabezado_fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
-            encabezado_font = Font(bold=True)
-
-            for col in range(1, sheet.max_column + 1):
-                cell = sheet.cell(row=1, column=col)
-                cell.value = str(cell.value).upper()
-                cell.fill = encabezado_fill
-                cell.font = encabezado_font
-
-            # Colores para tipo_muestra
-            colores = {
-                "PECLSTD006": "F7F99F",
-                "PECLSTD007": "3785BF",
-                "RG": "F0DEF2",
-                "DP": "B5E6A2"
-            }
-
-            tipo_col = None
-            for col in range(1, sheet.max_column + 1):
-                if sheet.cell(row=1, column=col).value == "TIPO_MUESTRA":
-                    tipo_col = col
-                    break
-
-            if tipo_col:
-                for row in range(2, sheet.max_row + 1):
-                    value = sheet.cell(row=row, column=tipo_col).value
-                    if value in colores:
-                        sheet.cell(row=row, column=tipo_col).fill = PatternFill(start_color=colores[value], end_color=colores[value], fill_type="solid")
-
-            workbook.save(filename)
-
-    except Exception as e:
-        st.error(f"Error al exportar a Excel: {e}")
-        
 # Botones de validación con tablas interactivas
 if st.button("Validar Geology", key="validate_geology") and geology_file:
-    geology_df = leer_csv(geology_file)
-    resultados_geo = validar_geo(geology_df, hole_number)
+    # Sin almacén: validar Geology vectorizado es más barato que calcular las huellas de las filas
+    resultados_geo = ejecutar(motor.validar_geo, geology_df, hole_number)
     st.dataframe(resultados_geo)  # Tabla interactiva
-    descargar_resultados(resultados_geo, "resultados_geology.csv")
+    descargar_resultados(resultados_geo, "resultados_geology")
 
 if st.button("Validar Sample & Standards", key="validate_sample_standards") and sample_file and standards_file:
-    sample_df = leer_csv(sample_file)
-    standards_df = leer_csv(standards_file)
-    resultados_sample_standards = validar_sample_standards(sample_df, standards_df, hole_number)
+    resultados_sample_standards = ejecutar(motor.validar_sample_standards, sample_df, standards_df, hole_number)
 
     if resultados_sample_standards is not None:
         st.dataframe(resultados_sample_standards)
-        exportar_a_excel(resultados_sample_standards, "PECLD07.xlsx")
-
-        with open("PECLD07.xlsx", "rb") as file:
-            st.download_button(label="⬇️ Descargar Excel",
-                               data=file,
-                               file_name="PECLD07.xlsx",
-                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    if resultados_sample_standards is not None and ejecutar(
+        exportacion.comprobar_exportable, resultados_sample_standards, "Excel"
+    ):
+        # El Excel se arma en memoria, y solo al hacer clic: no se escribe ningún archivo en el servidor
+        st.download_button(label="⬇️ Descargar Excel",
+                           data=lambda: exportacion.exportar_a_excel(resultados_sample_standards),
+                           file_name="PECLD07.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                           on_click="ignore")
             
 if st.button("Validar Alteration", key="validate_alteration") and alteration_file:
-    alteration_df = leer_csv(alteration_file)
-    resultados_alteration = validar_alteration(alteration_df, hole_number)
+    resultados_alteration = ejecutar(motor.validar_alteration, alteration_df, hole_number, almacen=obtener_almacen_veredictos())
     st.dataframe(resultados_alteration)
-    descargar_resultados(resultados_alteration, "resultados_alteration.csv")
+    descargar_resultados(resultados_alteration, "resultados_alteration")
 
+tolerancia = st.number_input(
+    "Tolerancia de profundidad para Intervals (m):",
+    min_value=0.0, value=motor.TOLERANCIA_PROFUNDIDAD, step=0.005, format="%.3f", key="tolerancia_input"
+)
 if st.button("Validar Intervals", key="validate_intervals") and sample_file:
-    sample_df = leer_csv(sample_file)
-    
-    archivos = {
-        "Geology": geology_file,
-        "Major": major_file,
-        "Alteration": alteration_file,
-        "Mine": mine_file
+    # Las tablas ya se leyeron (una sola vez, desde la caché) al inicio del script
+    tablas = {
+        "Geology": geology_df,
+        "Major": major_df,
+        "Alteration": alteration_df,
+        "Mine": mine_df
     }
     
     resultados_totales = []
     
-    for tipo, archivo in archivos.items():
-        if archivo:
-            validation_df = leer_csv(archivo)
-            resultados = validar_intervalos(sample_df, validation_df, tipo, hole_number)
+    for tipo, validation_df in tablas.items():
+        if validation_df is not None:
+            resultados = ejecutar(
+                motor.validar_intervalos, sample_df, validation_df, tipo, hole_number, tolerancia,
+                almacen=obtener_almacen_veredictos()
+            )
             if resultados is not None:
                 resultados_totales.append(resultados)
     
     if resultados_totales:
         resultados_finales = pd.concat(resultados_totales, ignore_index=True)
         st.dataframe(resultados_finales)
-        descargar_resultados(resultados_finales, "resultados_validacion.csv")
+        descargar_resultados(resultados_finales, "resultados_validacion")
 
 if st.button("Validar Major", key="validate_major") and geology_file and major_file:
-    geology_df = leer_csv(geology_file)
-    major_df = leer_csv(major_file)
-
     if major_df is None or major_df.empty:
         st.error("Error: El archivo Major está vacío o no se pudo cargar correctamente.")
         st.stop()  # Detiene la ejecución sin errores
 
-    resultados_major = validar_major_geology(geology_df, major_df, hole_number)
+    resultados_major = ejecutar(
+        motor.validar_major_geology, geology_df, major_df, hole_number, almacen=obtener_almacen_veredictos()
+    )
     if resultados_major is not None:
         st.dataframe(resultados_major)
-        descargar_resultados(resultados_major, "resultados_major.csv")
-
-
-
-# Lista de estándares a analizar
-estandares_relevantes = ["PECLSTD006", "DP", "RG", "PECLSTD007", "PECLBLK002"]
-
-# Función para calcular el porcentaje de estándares respecto a las muestras OR
-def calcular_porcentaje_standards(sample_df, standards_df, hole_number):
-    if sample_df is None or standards_df is None:
-        st.warning("Error: No se han cargado ambos archivos correctamente.")
-        return None, None
-
-    # Filtrar por HOLE_NUMBER
-    sample_filtrado = sample_df[sample_df["hole_number"] == hole_number]
-    standards_filtrado = standards_df[standards_df["hole_number"] == hole_number]
-
-    # Filtrar muestras OR (excluyendo DP y RG)
-    muestras_or = sample_filtrado[~sample_filtrado["assay_sample_type_code"].isin(["DP", "RG"])]
-    total_muestras_or = len(muestras_or)
-
-    # Filtrar muestras DP y RG (que cuentan como estándares)
-    muestras_dp_rg = sample_filtrado[sample_filtrado["assay_sample_type_code"].isin(["DP", "RG"])]
-    total_dp_rg = len(muestras_dp_rg)
-
-    total_standards = len(standards_filtrado)
-
-    if total_muestras_or == 0 and total_standards == 0 and total_dp_rg == 0:
-        st.warning(f"No se encontraron datos para HOLE_NUMBER: {hole_number}")
-        return None, None
-
-    # Calcular porcentaje con la ecuación correcta
-    porcentaje_standards = (total_standards + total_dp_rg) / (total_standards + total_dp_rg + total_muestras_or) if (total_standards + total_dp_rg + total_muestras_or) > 0 else 0
-
-    # Crear DataFrame con los resultados
-    resumen_df = pd.DataFrame({
-        "HOLE_NUMBER": [hole_number],
-        "Total Muestras OR": [total_muestras_or],
-        "Total Standards Relevantes": [total_standards],
-        "Total DP/RG (como estándares)": [total_dp_rg],
-        "Porcentaje Standards (%)": [porcentaje_standards * 100]
-    })
+        descargar_resultados(resultados_major, "resultados_major")
+
+if st.button("Validar continuidad de intervalos", key="validate_continuity") and hole_number:
+    # Huecos, superposiciones y tramos fuera de orden en cada tabla, y tramos
+    # de Sample sin logueo en las demás (o al revés)
+    resultados_continuidad = ejecutar(
+        motor.validar_continuidad,
+        {"Sample": sample_df, "Geology": geology_df, "Major": major_df, "Alteration": alteration_df, "Mine": mine_df},
+        hole_number, tolerancia
+    )
+    if resultados_continuidad is not None:
+        if resultados_continuidad.empty:
+            st.success("Sin huecos ni superposiciones en las tablas cargadas.")
+        st.dataframe(resultados_continuidad)
+        descargar_resultados(resultados_continuidad, "resultados_continuidad")
 
-    return resumen_df, porcentaje_standards
 
 
 # Botón para validar Sample & Standards y calcular el porcentaje
 if st.button("Ingreso de Sample & Standards", key="validate_sample_standards2") and hole_number:
-    resultados_sample_standards = validar_sample_standards(sample_df, standards_df, hole_number)
+    resultados_sample_standards = ejecutar(motor.validar_sample_standards, sample_df, standards_df, hole_number)
     st.subheader("Resultados de validación:")
     st.dataframe(resultados_sample_standards)
 
     # 🔥 Nuevo análisis de porcentaje de estándares
-    resumen_df, porcentaje = calcular_porcentaje_standards(sample_df, standards_df, hole_number)
+    resumen_df, porcentaje = ejecutar(motor.calcular_porcentaje_standards, sample_df, standards_df, hole_number) or (None, None)
     if resumen_df is not None:
         st.subheader("Resultados del análisis de estándares")
         st.dataframe(resumen_df)  # Tabla interactiva
 
         # Gráfico de barras con datos filtrados
-        fig = px.bar(
-            resumen_df.melt(value_vars=["Total Muestras OR", "Total Standards Relevantes", "Total DP/RG (como estándares)"]),
-            x="variable", y="value", text="value",
-            title=f"Comparación entre Muestras OR, Standards y DP/RG para HOLE_NUMBER {hole_number}",
-            labels={"variable": "Tipo", "value": "Cantidad"},
-            color="variable"
-        )
-        st.plotly_chart(fig)
+        with instrumentacion.etapa("plotly_chart porcentaje_standards", filas_entrada=len(resumen_df)):
+            fig = px.bar(
+                resumen_df.melt(value_vars=["Total Muestras OR", "Total Standards Relevantes", "Total DP/RG (como estándares)"]),
+                x="variable", y="value", text="value",
+                title=f"Comparación entre Muestras OR, Standards y DP/RG para HOLE_NUMBER {hole_number}",
+                labels={"variable": "Tipo", "value": "Cantidad"},
+                color="variable"
+            )
+            st.plotly_chart(fig)
+
+
+# Porcentaje de standards de todos los pozos, con los que quedan bajo el umbral marcados
+umbral_standards = st.number_input(
+    "Porcentaje mínimo de standards y DP/RG por pozo (%):",
+    min_value=0.0, max_value=100.0, value=motor.UMBRAL_PORCENTAJE_STANDARDS, step=0.5, format="%.1f",
+    key="umbral_standards_input"
+)
+if st.button("Porcentaje de standards de la campaña", key="standards_campaign") and sample_file and standards_file:
+    porcentajes_campana = ejecutar(motor.porcentaje_standards_campana, sample_df, standards_df, umbral_standards)
+    if porcentajes_campana is not None:
+        bajo_umbral = int((porcentajes_campana["validación"] != "Correcto").sum())
+        st.write(f"{bajo_umbral} de {len(porcentajes_campana)} pozos bajo el {umbral_standards:g} %")
+
+        # Un punto por pozo dibujado con WebGL, para que el gráfico siga fluido con miles de pozos
+        with instrumentacion.etapa("plotly_chart porcentaje_standards_campana", filas_entrada=len(porcentajes_campana)):
+            fig = px.scatter(
+                porcentajes_campana, x="HOLE_NUMBER", y="Porcentaje Standards (%)", color="validación",
+                hover_data=["Total Muestras OR", "Total Standards Relevantes", "Total DP/RG (como estándares)",
+                            *motor.estandares_relevantes],
+                title="Porcentaje de standards y DP/RG por HOLE_NUMBER", render_mode="webgl"
+            )
+            fig.add_hline(y=umbral_standards, line_dash="dash", annotation_text=f"Umbral {umbral_standards:g} %")
+            fig.update_xaxes(showticklabels=len(porcentajes_campana) <= 100)
+            st.plotly_chart(fig)
+
+        st.dataframe(porcentajes_campana)
+        descargar_resultados(porcentajes_campana, "porcentaje_standards_campana")
+
+
+# Validación de todos los HOLE_NUMBER cargados en una sola pasada
+if st.button("Validar campaña completa", key="validate_campaign"):
+    resumen_campana, detalles_campana = ejecutar(
+        motor.validar_campana, geology_df, sample_df, standards_df, alteration_df, mine_df, major_df, tolerancia,
+        umbral_standards
+    ) or (None, None)
+    if resumen_campana is not None:
+        aprobados = int((resumen_campana["estado"] == "Aprobado").sum())
+        st.subheader("Resumen de la campaña por HOLE_NUMBER")
+        st.write(f"{aprobados} de {len(resumen_campana)} pozos aprobados")
+        st.dataframe(resumen_campana)
+        descargar_resultados(resumen_campana, "resumen_campana")
+
+        for nombre, detalle in detalles_campana.items():
+            with st.expander(f"Detalle {nombre}"):
+                st.dataframe(detalle)
+                descargar_resultados(detalle, "campana_" + nombre.lower().replace(" & ", "_"))
+
+
+# Diagnóstico de esta ejecución: tiempo, filas y memoria de cada etapa
+if etapas_diagnostico:
+    with st.expander("Diagnóstico (tiempos y memoria por etapa)"):
+        diagnostico = pd.DataFrame(etapas_diagnostico).sort_values("inicio", kind="stable")
+        diagnostico["etapa"] = ["  " * nivel + etapa for nivel, etapa in zip(diagnostico["nivel"], diagnostico["etapa"])]
+        st.dataframe(diagnostico.drop(columns=["nivel", "inicio"]).round(4))
@@ -0,0 +1,77 @@
+# Validación de los datos del Fusion por línea de comandos, p. ej. en el pipeline nocturno:
+#
+#   python validar_cli.py --geology geology.csv --sample sample.csv --standards standards.csv \
+#       --alteration alteration.csv --mine mine.csv --major major.csv --pozos all --procesos 8
+#
+# Escribe en --salida el resumen por pozo (resumen_campana.csv) y el detalle de cada validación.
+# Los pozos de --pozos sin filas en ninguna tabla se avisan y quedan en el resumen como "Sin datos";
+# si ninguno tiene datos, termina con error.
+import argparse
+import os
+import sys
+
+import instrumentacion
+import motor_validacion as motor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida los datos tomados en el Fusion")
+    for tabla in motor.TABLAS:
+        parser.add_argument(f"--{tabla}", metavar="CSV", help=f"archivo {tabla.capitalize()} (.csv)")
+    parser.add_argument("--pozos", default="all",
+                        help='HOLE_NUMBER separados por comas, o "all" para todos (por defecto)')
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(),
+                        help="procesos entre los que se reparten los pozos (por defecto, uno por núcleo)")
+    parser.add_argument("--tolerancia", type=float, default=motor.TOLERANCIA_PROFUNDIDAD,
+                        help="tolerancia de profundidad en metros para Intervals")
+    parser.add_argument("--umbral-standards", type=float, metavar="PORCENTAJE",
+                        help="marca como observados los pozos con menos standards y DP/RG que este "
+                             f"porcentaje de sus muestras (p. ej. {motor.UMBRAL_PORCENTAJE_STANDARDS:g})")
+    parser.add_argument("--salida", default="resultados", help="carpeta de resultados")
+    parser.add_argument("--memoria", action="store_true",
+                        help="informa la memoria de cada tabla leída, con y sin esquema")
+    parser.add_argument("--diagnostico", metavar="JSONL",
+                        help="archivo donde agregar el tiempo, las filas y la memoria de cada etapa (una línea JSON por etapa)")
+    args = parser.parse_args(argv)
+
+    if args.diagnostico:
+        instrumentacion.configurar_log(args.diagnostico)
+
+    pozos = None
+    if args.pozos.strip().lower() != "all":
+        pozos = [pozo.strip() for pozo in args.pozos.split(",") if pozo.strip()]
+
+    try:
+        archivos = {tabla: getattr(args, tabla) for tabla in motor.TABLAS if getattr(args, tabla)}
+        futuros = motor.leer_en_paralelo(archivos, pozos)
+        tablas = {tabla: futuros[tabla].result() if tabla in futuros else None for tabla in motor.TABLAS}
+        if args.memoria:
+            for tabla, df in tablas.items():
+                if df is not None:
+                    informe = motor.informe_memoria(getattr(args, tabla), df, tabla)
+                    print(f"{tabla}: {informe['filas']} filas, {informe['columnas']} columnas, "
+                          f"{informe['memoria_mb']:.1f} MB (sin esquema ~{informe['memoria_sin_esquema_mb']:.1f} MB)")
+        resumen, detalles = motor.validar_campana_paralela(
+            tablas, pozos, args.procesos, args.tolerancia, args.umbral_standards
+        )
+    except motor.ErrorValidacion as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    os.makedirs(args.salida, exist_ok=True)
+    resumen.to_csv(os.path.join(args.salida, "resumen_campana.csv"), index=False)
+    for nombre, detalle in detalles.items():
+        archivo = "detalle_" + nombre.lower().replace(" & ", "_") + ".csv"
+        detalle.to_csv(os.path.join(args.salida, archivo), index=False)
+
+    sin_datos = resumen.loc[resumen["estado"] == "Sin datos", "hole_number"]
+    if len(sin_datos):
+        print(f"Aviso: no se encontraron datos para HOLE_NUMBER: {', '.join(map(str, sin_datos))}", file=sys.stderr)
+
+    aprobados = int((resumen["estado"] == "Aprobado").sum())
+    print(f"{aprobados} de {len(resumen)} pozos aprobados. Resultados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())